@@ -1,13 +1,12 @@
 from langchain_openai import ChatOpenAI
 from graph.state import AgentState, show_agent_reasoning
-from tools.api import get_financial_metrics, get_market_cap, search_line_items
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from utils.progress import progress
-from utils.llm import call_llm
+from utils.llm import call_llm_batched
 import math
 
 
@@ -17,6 +16,24 @@ class BenGrahamSignal(BaseModel):
     reasoning: str
 
 
+GRAHAM_LINE_ITEM_SEARCH = {
+    "line_items": [
+        "earnings_per_share",
+        "revenue",
+        "net_income",
+        "book_value_per_share",
+        "total_assets",
+        "total_liabilities",
+        "current_assets",
+        "current_liabilities",
+        "dividends_and_other_cash_distributions",
+        "outstanding_shares",
+    ],
+    "period": "annual",
+    "limit": 10,
+}
+
+
 def ben_graham_agent(state: AgentState):
     """
     Analyzes stocks using Benjamin Graham's classic value-investing principles:
@@ -26,21 +43,21 @@ def ben_graham_agent(state: AgentState):
     4. Adequate margin of safety.
     """
     data = state["data"]
-    end_date = data["end_date"]
     tickers = data["tickers"]
+    snapshot = data["snapshot"]
 
     analysis_data = {}
     graham_analysis = {}
 
     for ticker in tickers:
         progress.update_status("ben_graham_agent", ticker, "Fetching financial metrics")
-        metrics = get_financial_metrics(ticker, end_date, period="annual", limit=10)
+        metrics = snapshot.get_financial_metrics(ticker, period="annual", limit=10)
 
         progress.update_status("ben_graham_agent", ticker, "Gathering financial line items")
-        financial_line_items = search_line_items(ticker, ["earnings_per_share", "revenue", "net_income", "book_value_per_share", "total_assets", "total_liabilities", "current_assets", "current_liabilities", "dividends_and_other_cash_distributions", "outstanding_shares"], end_date, period="annual", limit=10)
+        financial_line_items = snapshot.search_line_items(ticker, **GRAHAM_LINE_ITEM_SEARCH)
 
         progress.update_status("ben_graham_agent", ticker, "Getting market cap")
-        market_cap = get_market_cap(ticker, end_date)
+        market_cap = snapshot.get_market_cap(ticker)
 
         # Perform sub-analyses
         progress.update_status("ben_graham_agent", ticker, "Analyzing earnings stability")
@@ -67,15 +84,14 @@ def ben_graham_agent(state: AgentState):
         analysis_data[ticker] = {"signal": signal, "score": total_score, "max_score": max_possible_score, "earnings_analysis": earnings_analysis, "strength_analysis": strength_analysis, "valuation_analysis": valuation_analysis}
 
         progress.update_status("ben_graham_agent", ticker, "Generating Ben Graham analysis")
-        graham_output = generate_graham_output(
-            ticker=ticker,
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
 
+    graham_outputs = generate_graham_output(
+        analysis_data=analysis_data,
+        model_name=state["metadata"]["model_name"],
+        model_provider=state["metadata"]["model_provider"],
+    )
+    for ticker, graham_output in graham_outputs.items():
         graham_analysis[ticker] = {"signal": graham_output.signal, "confidence": graham_output.confidence, "reasoning": graham_output.reasoning}
-
         progress.update_status("ben_graham_agent", ticker, "Done")
 
     # Wrap results in a single message for the chain
@@ -277,11 +293,10 @@ def analyze_valuation_graham(metrics: list, financial_line_items: list, market_c
 
 
 def generate_graham_output(
-    ticker: str,
     analysis_data: dict[str, any],
     model_name: str,
     model_provider: str,
-) -> BenGrahamSignal:
+) -> dict[str, BenGrahamSignal]:
     """
     Generates an investment decision in the style of Benjamin Graham:
     - Value emphasis, margin of safety, net-nets, conservative balance sheet, stable earnings.
@@ -329,16 +344,12 @@ def generate_graham_output(
         )
     ])
 
-    prompt = template.invoke({
-        "analysis_data": json.dumps(analysis_data, indent=2),
-        "ticker": ticker
-    })
-
     def create_default_ben_graham_signal():
         return BenGrahamSignal(signal="neutral", confidence=0.0, reasoning="Error in generating analysis; defaulting to neutral.")
 
-    return call_llm(
-        prompt=prompt,
+    return call_llm_batched(
+        template,
+        analysis_data,
         model_name=model_name,
         model_provider=model_provider,
         pydantic_model=BenGrahamSignal,
@@ -1,13 +1,12 @@
 from langchain_openai import ChatOpenAI
 from graph.state import AgentState, show_agent_reasoning
-from tools.api import get_financial_metrics, get_market_cap, search_line_items
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from utils.progress import progress
-from utils.llm import call_llm
+from utils.llm import call_llm_batched
 
 class BillAckmanSignal(BaseModel):
     signal: Literal["bullish", "bearish", "neutral"]
@@ -15,43 +14,44 @@ class BillAckmanSignal(BaseModel):
     reasoning: str
 
 
+ACKMAN_LINE_ITEM_SEARCH = {
+    "line_items": [
+        "revenue",
+        "operating_margin",
+        "debt_to_equity",
+        "free_cash_flow",
+        "total_assets",
+        "total_liabilities",
+        "dividends_and_other_cash_distributions",
+        "outstanding_shares",
+    ],
+    "period": "annual",
+    "limit": 5,
+}
+
+
 def bill_ackman_agent(state: AgentState):
     """
     Analyzes stocks using Bill Ackman's investing principles and LLM reasoning.
     Fetches multiple periods of data so we can analyze long-term trends.
     """
     data = state["data"]
-    end_date = data["end_date"]
     tickers = data["tickers"]
+    snapshot = data["snapshot"]
     
     analysis_data = {}
     ackman_analysis = {}
     
     for ticker in tickers:
         progress.update_status("bill_ackman_agent", ticker, "Fetching financial metrics")
-        metrics = get_financial_metrics(ticker, end_date, period="annual", limit=5)
+        metrics = snapshot.get_financial_metrics(ticker, period="annual", limit=5)
         
         progress.update_status("bill_ackman_agent", ticker, "Gathering financial line items")
         # Request multiple periods of data (annual or TTM) for a more robust long-term view.
-        financial_line_items = search_line_items(
-            ticker,
-            [
-                "revenue",
-                "operating_margin",
-                "debt_to_equity",
-                "free_cash_flow",
-                "total_assets",
-                "total_liabilities",
-                "dividends_and_other_cash_distributions",
-                "outstanding_shares"
-            ],
-            end_date,
-            period="annual",  # or "ttm" if you prefer trailing 12 months
-            limit=5           # fetch up to 5 annual periods (or more if needed)
-        )
+        financial_line_items = snapshot.search_line_items(ticker, **ACKMAN_LINE_ITEM_SEARCH)
         
         progress.update_status("bill_ackman_agent", ticker, "Getting market cap")
-        market_cap = get_market_cap(ticker, end_date)
+        market_cap = snapshot.get_market_cap(ticker)
         
         progress.update_status("bill_ackman_agent", ticker, "Analyzing business quality")
         quality_analysis = analyze_business_quality(metrics, financial_line_items)
@@ -84,19 +84,18 @@ def bill_ackman_agent(state: AgentState):
         }
         
         progress.update_status("bill_ackman_agent", ticker, "Generating Bill Ackman analysis")
-        ackman_output = generate_ackman_output(
-            ticker=ticker, 
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
-        
+
+    ackman_outputs = generate_ackman_output(
+        analysis_data=analysis_data,
+        model_name=state["metadata"]["model_name"],
+        model_provider=state["metadata"]["model_provider"],
+    )
+    for ticker, ackman_output in ackman_outputs.items():
         ackman_analysis[ticker] = {
             "signal": ackman_output.signal,
             "confidence": ackman_output.confidence,
             "reasoning": ackman_output.reasoning
         }
-        
         progress.update_status("bill_ackman_agent", ticker, "Done")
     
     # Wrap results in a single message for the chain
@@ -336,11 +335,10 @@ def analyze_valuation(financial_line_items: list, market_cap: float) -> dict:
 
 
 def generate_ackman_output(
-    ticker: str,
     analysis_data: dict[str, any],
     model_name: str,
     model_provider: str,
-) -> BillAckmanSignal:
+) -> dict[str, BillAckmanSignal]:
     """
     Generates investment decisions in the style of Bill Ackman.
     """
@@ -394,11 +392,6 @@ def generate_ackman_output(
         )
     ])
 
-    prompt = template.invoke({
-        "analysis_data": json.dumps(analysis_data, indent=2),
-        "ticker": ticker
-    })
-
     def create_default_bill_ackman_signal():
         return BillAckmanSignal(
             signal="neutral",
@@ -406,11 +399,12 @@ def generate_ackman_output(
             reasoning="Error in analysis, defaulting to neutral"
         )
 
-    return call_llm(
-        prompt=prompt, 
-        model_name=model_name, 
-        model_provider=model_provider, 
-        pydantic_model=BillAckmanSignal, 
-        agent_name="bill_ackman_agent", 
+    return call_llm_batched(
+        template,
+        analysis_data,
+        model_name=model_name,
+        model_provider=model_provider,
+        pydantic_model=BillAckmanSignal,
+        agent_name="bill_ackman_agent",
         default_factory=create_default_bill_ackman_signal,
     )
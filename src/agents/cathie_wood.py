@@ -1,13 +1,12 @@
 from langchain_openai import ChatOpenAI
 from graph.state import AgentState, show_agent_reasoning
-from tools.api import get_financial_metrics, get_market_cap, search_line_items
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from utils.progress import progress
-from utils.llm import call_llm
+from utils.llm import call_llm_batched
 
 class CathieWoodSignal(BaseModel):
     signal: Literal["bullish", "bearish", "neutral"]
@@ -15,6 +14,26 @@ class CathieWoodSignal(BaseModel):
     reasoning: str
 
 
+WOOD_LINE_ITEM_SEARCH = {
+    "line_items": [
+        "revenue",
+        "gross_margin",
+        "operating_margin",
+        "debt_to_equity",
+        "free_cash_flow",
+        "total_assets",
+        "total_liabilities",
+        "dividends_and_other_cash_distributions",
+        "outstanding_shares",
+        "research_and_development",
+        "capital_expenditure",
+        "operating_expense",
+    ],
+    "period": "annual",
+    "limit": 5,
+}
+
+
 def cathie_wood_agent(state: AgentState):
     """
     Analyzes stocks using Cathie Wood's investing principles and LLM reasoning.
@@ -24,42 +43,22 @@ def cathie_wood_agent(state: AgentState):
     4. Willing to endure short-term volatility for long-term gains.
     """
     data = state["data"]
-    end_date = data["end_date"]
     tickers = data["tickers"]
+    snapshot = data["snapshot"]
 
     analysis_data = {}
     cw_analysis = {}
 
     for ticker in tickers:
         progress.update_status("cathie_wood_agent", ticker, "Fetching financial metrics")
-        metrics = get_financial_metrics(ticker, end_date, period="annual", limit=5)
+        metrics = snapshot.get_financial_metrics(ticker, period="annual", limit=5)
 
         progress.update_status("cathie_wood_agent", ticker, "Gathering financial line items")
         # Request multiple periods of data (annual or TTM) for a more robust view.
-        financial_line_items = search_line_items(
-            ticker,
-            [
-                "revenue",
-                "gross_margin",
-                "operating_margin",
-                "debt_to_equity",
-                "free_cash_flow",
-                "total_assets",
-                "total_liabilities",
-                "dividends_and_other_cash_distributions",
-                "outstanding_shares",
-                "research_and_development",
-                "capital_expenditure",
-                "operating_expense",
-
-            ],
-            end_date,
-            period="annual",
-            limit=5
-        )
+        financial_line_items = snapshot.search_line_items(ticker, **WOOD_LINE_ITEM_SEARCH)
 
         progress.update_status("cathie_wood_agent", ticker, "Getting market cap")
-        market_cap = get_market_cap(ticker, end_date)
+        market_cap = snapshot.get_market_cap(ticker)
 
         progress.update_status("cathie_wood_agent", ticker, "Analyzing disruptive potential")
         disruptive_analysis = analyze_disruptive_potential(metrics, financial_line_items)
@@ -91,19 +90,18 @@ def cathie_wood_agent(state: AgentState):
         }
 
         progress.update_status("cathie_wood_agent", ticker, "Generating Cathie Wood analysis")
-        cw_output = generate_cathie_wood_output(
-            ticker=ticker,
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
 
+    cw_outputs = generate_cathie_wood_output(
+        analysis_data=analysis_data,
+        model_name=state["metadata"]["model_name"],
+        model_provider=state["metadata"]["model_provider"],
+    )
+    for ticker, cw_output in cw_outputs.items():
         cw_analysis[ticker] = {
             "signal": cw_output.signal,
             "confidence": cw_output.confidence,
             "reasoning": cw_output.reasoning
         }
-
         progress.update_status("cathie_wood_agent", ticker, "Done")
 
     message = HumanMessage(
@@ -420,11 +418,10 @@ def analyze_cathie_wood_valuation(financial_line_items: list, market_cap: float)
 
 
 def generate_cathie_wood_output(
-    ticker: str,
     analysis_data: dict[str, any],
     model_name: str,
     model_provider: str,
-) -> CathieWoodSignal:
+) -> dict[str, CathieWoodSignal]:
     """
     Generates investment decisions in the style of Cathie Wood.
     """
@@ -476,11 +473,6 @@ def generate_cathie_wood_output(
         )
     ])
 
-    prompt = template.invoke({
-        "analysis_data": json.dumps(analysis_data, indent=2),
-        "ticker": ticker
-    })
-
     def create_default_cathie_wood_signal():
         return CathieWoodSignal(
             signal="neutral",
@@ -488,8 +480,9 @@ def generate_cathie_wood_output(
             reasoning="Error in analysis, defaulting to neutral"
         )
 
-    return call_llm(
-        prompt=prompt,
+    return call_llm_batched(
+        template,
+        analysis_data,
         model_name=model_name,
         model_provider=model_provider,
         pydantic_model=CathieWoodSignal,
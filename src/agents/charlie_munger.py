@@ -1,12 +1,11 @@
 from graph.state import AgentState, show_agent_reasoning
-from tools.api import get_financial_metrics, get_market_cap, search_line_items, get_insider_trades, get_company_news
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from utils.progress import progress
-from utils.llm import call_llm
+from utils.llm import call_llm_batched
 
 class CharlieMungerSignal(BaseModel):
     signal: Literal["bullish", "bearish", "neutral"]
@@ -14,66 +13,63 @@ class CharlieMungerSignal(BaseModel):
     reasoning: str
 
 
+MUNGER_LINE_ITEM_SEARCH = {
+    "line_items": [
+        "revenue",
+        "net_income",
+        "operating_income",
+        "return_on_invested_capital",
+        "gross_margin",
+        "operating_margin",
+        "free_cash_flow",
+        "capital_expenditure",
+        "cash_and_equivalents",
+        "total_debt",
+        "shareholders_equity",
+        "outstanding_shares",
+        "research_and_development",
+        "goodwill_and_intangible_assets",
+    ],
+    "period": "annual",
+    "limit": 10,
+}
+
+
 def charlie_munger_agent(state: AgentState):
     """
     Analyzes stocks using Charlie Munger's investing principles and mental models.
     Focuses on moat strength, management quality, predictability, and valuation.
     """
     data = state["data"]
-    end_date = data["end_date"]
     tickers = data["tickers"]
+    snapshot = data["snapshot"]
     
     analysis_data = {}
     munger_analysis = {}
     
     for ticker in tickers:
         progress.update_status("charlie_munger_agent", ticker, "Fetching financial metrics")
-        metrics = get_financial_metrics(ticker, end_date, period="annual", limit=10)  # Munger looks at longer periods
+        metrics = snapshot.get_financial_metrics(ticker, period="annual", limit=10)  # Munger looks at longer periods
         
         progress.update_status("charlie_munger_agent", ticker, "Gathering financial line items")
-        financial_line_items = search_line_items(
-            ticker,
-            [
-                "revenue",
-                "net_income",
-                "operating_income",
-                "return_on_invested_capital",
-                "gross_margin",
-                "operating_margin",
-                "free_cash_flow",
-                "capital_expenditure",
-                "cash_and_equivalents",
-                "total_debt",
-                "shareholders_equity",
-                "outstanding_shares",
-                "research_and_development",
-                "goodwill_and_intangible_assets",
-            ],
-            end_date,
-            period="annual",
-            limit=10  # Munger examines long-term trends
-        )
+        financial_line_items = snapshot.search_line_items(ticker, **MUNGER_LINE_ITEM_SEARCH)
         
         progress.update_status("charlie_munger_agent", ticker, "Getting market cap")
-        market_cap = get_market_cap(ticker, end_date)
+        market_cap = snapshot.get_market_cap(ticker)
         
         progress.update_status("charlie_munger_agent", ticker, "Fetching insider trades")
         # Munger values management with skin in the game
-        insider_trades = get_insider_trades(
+        insider_trades = snapshot.get_insider_trades(
             ticker,
-            end_date,
             # Look back 2 years for insider trading patterns
-            start_date=None,
             limit=100
         )
         
         progress.update_status("charlie_munger_agent", ticker, "Fetching company news")
         # Munger avoids businesses with frequent negative press
-        company_news = get_company_news(
+        company_news = snapshot.get_company_news(
             ticker,
-            end_date,
             # Look back 1 year for news
-            start_date=None,
             limit=100
         )
         
@@ -121,19 +117,18 @@ def charlie_munger_agent(state: AgentState):
         }
         
         progress.update_status("charlie_munger_agent", ticker, "Generating Charlie Munger analysis")
-        munger_output = generate_munger_output(
-            ticker=ticker, 
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
-        
+
+    munger_outputs = generate_munger_output(
+        analysis_data=analysis_data,
+        model_name=state["metadata"]["model_name"],
+        model_provider=state["metadata"]["model_provider"],
+    )
+    for ticker, munger_output in munger_outputs.items():
         munger_analysis[ticker] = {
             "signal": munger_output.signal,
             "confidence": munger_output.confidence,
             "reasoning": munger_output.reasoning
         }
-        
         progress.update_status("charlie_munger_agent", ticker, "Done")
     
     # Wrap results in a single message for the chain
@@ -660,11 +655,10 @@ def analyze_news_sentiment(news_items: list) -> str:
 
 
 def generate_munger_output(
-    ticker: str,
     analysis_data: dict[str, any],
     model_name: str,
     model_provider: str,
-) -> CharlieMungerSignal:
+) -> dict[str, CharlieMungerSignal]:
     """
     Generates investment decisions in the style of Charlie Munger.
     """
@@ -722,11 +716,6 @@ def generate_munger_output(
         )
     ])
 
-    prompt = template.invoke({
-        "analysis_data": json.dumps(analysis_data, indent=2),
-        "ticker": ticker
-    })
-
     def create_default_charlie_munger_signal():
         return CharlieMungerSignal(
             signal="neutral",
@@ -734,11 +723,12 @@ def generate_munger_output(
             reasoning="Error in analysis, defaulting to neutral"
         )
 
-    return call_llm(
-        prompt=prompt, 
-        model_name=model_name, 
-        model_provider=model_provider, 
-        pydantic_model=CharlieMungerSignal, 
-        agent_name="charlie_munger_agent", 
+    return call_llm_batched(
+        template,
+        analysis_data,
+        model_name=model_name,
+        model_provider=model_provider,
+        pydantic_model=CharlieMungerSignal,
+        agent_name="charlie_munger_agent",
         default_factory=create_default_charlie_munger_signal,
-    )
\ No newline at end of file
+    )
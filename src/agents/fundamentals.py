@@ -3,15 +3,13 @@ from graph.state import AgentState, show_agent_reasoning
 from utils.progress import progress
 import json
 
-from tools.api import get_financial_metrics
-
 
 ##### Fundamental Agent #####
 def fundamentals_agent(state: AgentState):
     """Analyzes fundamental data and generates trading signals for multiple tickers."""
     data = state["data"]
-    end_date = data["end_date"]
     tickers = data["tickers"]
+    snapshot = data["snapshot"]
 
     # Initialize fundamental analysis for each ticker
     fundamental_analysis = {}
@@ -20,9 +18,8 @@ def fundamentals_agent(state: AgentState):
         progress.update_status("fundamentals_agent", ticker, "Fetching financial metrics")
 
         # Get the financial metrics
-        financial_metrics = get_financial_metrics(
+        financial_metrics = snapshot.get_financial_metrics(
             ticker=ticker,
-            end_date=end_date,
             period="ttm",
             limit=10,
         )
@@ -5,15 +5,13 @@ import pandas as pd
 import numpy as np
 import json
 
-from tools.api import get_insider_trades, get_company_news
-
 
 ##### Sentiment Agent #####
 def sentiment_agent(state: AgentState):
     """Analyzes market sentiment and generates trading signals for multiple tickers."""
     data = state.get("data", {})
-    end_date = data.get("end_date")
     tickers = data.get("tickers")
+    snapshot = data.get("snapshot")
 
     # Initialize sentiment analysis for each ticker
     sentiment_analysis = {}
@@ -22,9 +20,8 @@ def sentiment_agent(state: AgentState):
         progress.update_status("sentiment_agent", ticker, "Fetching insider trades")
 
         # Get the insider trades
-        insider_trades = get_insider_trades(
+        insider_trades = snapshot.get_insider_trades(
             ticker=ticker,
-            end_date=end_date,
             limit=1000,
         )
 
@@ -37,7 +34,7 @@ def sentiment_agent(state: AgentState):
         progress.update_status("sentiment_agent", ticker, "Fetching company news")
 
         # Get the company news
-        company_news = get_company_news(ticker, end_date, limit=100)
+        company_news = snapshot.get_company_news(ticker, limit=100)
 
         # Get the sentiment from the company news
         sentiment = pd.Series([n.sentiment for n in company_news]).dropna()
@@ -3,15 +3,26 @@ from graph.state import AgentState, show_agent_reasoning
 from utils.progress import progress
 import json
 
-from tools.api import get_financial_metrics, get_market_cap, search_line_items
-
 
 ##### Valuation Agent #####
+VALUATION_LINE_ITEM_SEARCH = {
+    "line_items": [
+        "free_cash_flow",
+        "net_income",
+        "depreciation_and_amortization",
+        "capital_expenditure",
+        "working_capital",
+    ],
+    "period": "ttm",
+    "limit": 2,
+}
+
+
 def valuation_agent(state: AgentState):
     """Performs detailed valuation analysis using multiple methodologies for multiple tickers."""
     data = state["data"]
-    end_date = data["end_date"]
     tickers = data["tickers"]
+    snapshot = data["snapshot"]
 
     # Initialize valuation analysis for each ticker
     valuation_analysis = {}
@@ -20,9 +31,8 @@ def valuation_agent(state: AgentState):
         progress.update_status("valuation_agent", ticker, "Fetching financial data")
 
         # Fetch the financial metrics
-        financial_metrics = get_financial_metrics(
+        financial_metrics = snapshot.get_financial_metrics(
             ticker=ticker,
-            end_date=end_date,
             period="ttm",
         )
 
@@ -35,19 +45,7 @@ def valuation_agent(state: AgentState):
 
         progress.update_status("valuation_agent", ticker, "Gathering line items")
         # Fetch the specific line_items that we need for valuation purposes
-        financial_line_items = search_line_items(
-            ticker=ticker,
-            line_items=[
-                "free_cash_flow",
-                "net_income",
-                "depreciation_and_amortization",
-                "capital_expenditure",
-                "working_capital",
-            ],
-            end_date=end_date,
-            period="ttm",
-            limit=2,
-        )
+        financial_line_items = snapshot.search_line_items(ticker, **VALUATION_LINE_ITEM_SEARCH)
 
         # Add safety check for financial line items
         if len(financial_line_items) < 2:
@@ -85,7 +83,7 @@ def valuation_agent(state: AgentState):
 
         progress.update_status("valuation_agent", ticker, "Comparing to market value")
         # Get the market cap
-        market_cap = get_market_cap(ticker=ticker, end_date=end_date)
+        market_cap = snapshot.get_market_cap(ticker)
 
         # Calculate combined valuation gap (average of both methods)
         dcf_gap = (dcf_value - market_cap) / market_cap
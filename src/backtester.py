@@ -1,3 +1,4 @@
+import os
 import sys
 
 from datetime import datetime, timedelta
@@ -12,15 +13,15 @@ import itertools
 
 from llm.models import LLM_ORDER, get_model_info
 from utils.analysts import ANALYST_ORDER
+from data.cache import configure_cache, get_cache
+from llm.cache import configure_llm_cache
 from main import run_hedge_fund
 from tools.api import (
-    get_company_news,
     get_price_data,
-    get_prices,
-    get_financial_metrics,
-    get_insider_trades,
+    prefetch_universe,
 )
-from utils.display import print_backtest_results, format_backtest_row
+from tools.metrics import get_api_metrics
+from utils.display import print_api_metrics, print_backtest_results, format_backtest_row
 from typing_extensions import Callable
 
 init(autoreset=True)
@@ -279,18 +280,15 @@ class Backtester:
         start_date_dt = end_date_dt - relativedelta(years=1)
         start_date_str = start_date_dt.strftime("%Y-%m-%d")
 
-        for ticker in self.tickers:
-            # Fetch price data for the entire period, plus 1 year
-            get_prices(ticker, start_date_str, self.end_date)
-
-            # Fetch financial metrics
-            get_financial_metrics(ticker, self.end_date, limit=10)
-
-            # Fetch insider trades
-            get_insider_trades(ticker, self.end_date, start_date=self.start_date, limit=1000)
-
-            # Fetch company news
-            get_company_news(ticker, self.end_date, start_date=self.start_date, limit=1000)
+        # Fetch prices for the entire period plus 1 year, and metrics, insider trades and news for the period,
+        # for all tickers concurrently
+        prefetch_universe(
+            self.tickers,
+            ["prices", "financial_metrics", "insider_trades", "company_news"],
+            start_date=self.start_date,
+            end_date=self.end_date,
+            start_dates={"prices": start_date_str},
+        )
 
         print("Data pre-fetch complete.")
 
@@ -649,9 +647,43 @@ if __name__ == "__main__":
         default=0.0,
         help="Margin ratio for short positions, e.g. 0.5 for 50% (default: 0.0)",
     )
+    parser.add_argument(
+        "--show-api-metrics",
+        action="store_true",
+        help="Show data API cache hits, request counts and latencies at the end of the backtest",
+    )
+    parser.add_argument(
+        "--llm-cache-path",
+        type=str,
+        default=os.getenv("LLM_CACHE_PATH"),
+        help="Directory used to keep LLM responses between runs. Defaults to LLM_CACHE_PATH (in-memory only if unset)",
+    )
+    parser.add_argument("--no-llm-cache", action="store_true", help="Always query the LLM, even for a prompt it has already answered")
+    parser.add_argument(
+        "--cache-path",
+        type=str,
+        default=os.getenv("DATA_CACHE_PATH"),
+        help="SQLite file used to persist fetched market data between runs. Defaults to DATA_CACHE_PATH (in-memory only if unset)",
+    )
+    parser.add_argument(
+        "--load-snapshot",
+        type=str,
+        help="Directory of a Parquet cache snapshot to warm the data cache from before running (requires pyarrow)",
+    )
+    parser.add_argument(
+        "--export-snapshot",
+        type=str,
+        help="Directory to write a Parquet snapshot of the data cache to after the run (requires pyarrow)",
+    )
 
     args = parser.parse_args()
 
+    # Persist fetched market data and LLM responses across runs if requested
+    configure_cache(args.cache_path)
+    configure_llm_cache(args.llm_cache_path, enabled=not args.no_llm_cache)
+    if args.load_snapshot:
+        get_cache().load(args.load_snapshot)
+
     # Parse tickers from comma-separated string
     tickers = [ticker.strip() for ticker in args.tickers.split(",")] if args.tickers else []
 
@@ -721,3 +753,9 @@ if __name__ == "__main__":
 
     performance_metrics = backtester.run_backtest()
     performance_df = backtester.analyze_performance()
+
+    if args.show_api_metrics:
+        print_api_metrics(get_api_metrics().snapshot())
+
+    if args.export_snapshot:
+        get_cache().export(args.export_snapshot)
@@ -1,65 +1,750 @@
-class Cache:
-    """In-memory cache for API responses."""
+import heapq
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from operator import attrgetter
+
+import pandas as pd
+from pydantic import BaseModel
+
+from data.models import CompanyNews, FinancialMetrics, InsiderTrade, Price
+
+
+class SQLiteCacheBackend:
+    """Persists cached API responses in a SQLite database so they survive restarts."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS records (dataset TEXT NOT NULL, ticker TEXT NOT NULL, payload TEXT NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS records_dataset_ticker ON records (dataset, ticker)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS coverage (dataset TEXT NOT NULL, ticker TEXT NOT NULL, start_date TEXT NOT NULL, end_date TEXT NOT NULL, fetched_at REAL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS coverage_dataset_ticker ON coverage (dataset, ticker)")
+            # Databases written before fetch times were recorded get the column; their intervals count as fetched at an unknown time
+            if "fetched_at" not in [column for _, column, *_ in self._conn.execute("PRAGMA table_info(coverage)")]:
+                self._conn.execute("ALTER TABLE coverage ADD COLUMN fetched_at REAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS fetches (dataset TEXT NOT NULL, ticker TEXT NOT NULL, fetched_at REAL NOT NULL, PRIMARY KEY (dataset, ticker))")
+
+    def load(self, dataset: str, ticker: str) -> list[dict[str, any]]:
+        """Load every stored record for a ticker, in insertion order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM records WHERE dataset = ? AND ticker = ? ORDER BY rowid", (dataset, ticker)).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def append(self, dataset: str, ticker: str, data: list[dict[str, any]]):
+        """Append new records for a ticker."""
+        if not data:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO records (dataset, ticker, payload) VALUES (?, ?, ?)", [(dataset, ticker, json.dumps(item)) for item in data])
+
+    def load_fetched_at(self, dataset: str, ticker: str) -> float | None:
+        """When data was last fetched for a ticker (a Unix timestamp), or None if that is not known."""
+        with self._lock:
+            row = self._conn.execute("SELECT fetched_at FROM fetches WHERE dataset = ? AND ticker = ?", (dataset, ticker)).fetchone()
+        return row[0] if row else None
+
+    def save_fetched_at(self, dataset: str, ticker: str, fetched_at: float):
+        """Record when data was last fetched for a ticker, whether or not the fetch returned new records."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO fetches (dataset, ticker, fetched_at) VALUES (?, ?, ?)", (dataset, ticker, fetched_at))
+
+    def load_coverage(self, dataset: str, ticker: str) -> list[tuple[str, str, float | None]]:
+        """Load the date intervals known to be fully fetched for a ticker, with the time each was fetched."""
+        with self._lock:
+            rows = self._conn.execute("SELECT start_date, end_date, fetched_at FROM coverage WHERE dataset = ? AND ticker = ? ORDER BY start_date", (dataset, ticker)).fetchall()
+        return [(start, end, fetched_at) for start, end, fetched_at in rows]
+
+    def save_coverage(self, dataset: str, ticker: str, intervals: list[tuple[str, str, float | None]]):
+        """Replace the stored coverage intervals for a ticker."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM coverage WHERE dataset = ? AND ticker = ?", (dataset, ticker))
+            self._conn.executemany("INSERT INTO coverage (dataset, ticker, start_date, end_date, fetched_at) VALUES (?, ?, ?, ?, ?)", [(dataset, ticker, *interval) for interval in intervals])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PriceSeries:
+    """Daily prices for one ticker, kept sorted by date so range lookups are a binary search plus a slice."""
 
     def __init__(self):
-        self._prices_cache: dict[str, list[dict[str, any]]] = {}
-        self._financial_metrics_cache: dict[str, list[dict[str, any]]] = {}
-        self._line_items_cache: dict[str, list[dict[str, any]]] = {}
-        self._insider_trades_cache: dict[str, list[dict[str, any]]] = {}
-        self._company_news_cache: dict[str, list[dict[str, any]]] = {}
-
-    def _merge_data(self, existing: list[dict] | None, new_data: list[dict], key_field: str) -> list[dict]:
-        """Merge existing and new data, avoiding duplicates based on a key field."""
-        if not existing:
-            return new_data
-
-        # Create a set of existing keys for O(1) lookup
-        existing_keys = {item[key_field] for item in existing}
-
-        # Only add items that don't exist yet
-        merged = existing.copy()
-        merged.extend([item for item in new_data if item[key_field] not in existing_keys])
-        return merged
-
-    def get_prices(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached price data if available."""
-        return self._prices_cache.get(ticker)
-
-    def set_prices(self, ticker: str, data: list[dict[str, any]]):
-        """Append new price data to cache."""
-        self._prices_cache[ticker] = self._merge_data(self._prices_cache.get(ticker), data, key_field="time")
-
-    def get_financial_metrics(self, ticker: str) -> list[dict[str, any]]:
-        """Get cached financial metrics if available."""
-        return self._financial_metrics_cache.get(ticker)
-
-    def set_financial_metrics(self, ticker: str, data: list[dict[str, any]]):
+        self.dates: list[str] = []
+        self.prices: list[Price] = []
+        self._frame: pd.DataFrame | None = None
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def merge(self, prices: list[Price]) -> list[Price]:
+        """Add prices for dates not present yet and return the ones that were added, oldest first."""
+        new: dict[str, Price] = {}
+        for price in prices:
+            date = price.time[:10]
+            index = bisect_left(self.dates, date)
+            if date not in new and not (index < len(self.dates) and self.dates[index] == date):
+                new[date] = price
+        if not new:
+            return []
+
+        new_dates = sorted(new)
+        added = [new[date] for date in new_dates]
+        self._frame = None
+        if not self.dates or new_dates[0] > self.dates[-1]:
+            # Common case: newer data is appended at the end
+            self.dates.extend(new_dates)
+            self.prices.extend(added)
+        else:
+            merged = list(heapq.merge(zip(self.dates, self.prices), zip(new_dates, added), key=lambda pair: pair[0]))
+            self.dates = [date for date, _ in merged]
+            self.prices = [price for _, price in merged]
+        return added
+
+    def between(self, start_date: str | None = None, end_date: str | None = None) -> list[Price]:
+        """Return the prices dated within [start_date, end_date], oldest first."""
+        lo, hi = self._bounds(start_date, end_date)
+        return self.prices[lo:hi]
+
+    def frame_between(self, start_date: str | None = None, end_date: str | None = None) -> pd.DataFrame:
+        """
+        Return the prices dated within [start_date, end_date] as a slice of one typed, date-indexed frame.
+
+        The frame is built on first use and again only after new prices are merged. Slices share its
+        data, so callers must treat them as read-only (adding columns is fine; it does not touch the frame).
+        """
+        if self._frame is None:
+            self._frame = prices_frame(self.prices)
+        lo, hi = self._bounds(start_date, end_date)
+        # Rows line up with self.dates, one per day, so positions from the bisect slice the frame as well
+        return self._frame.iloc[lo:hi]
+
+    def _bounds(self, start_date: str | None, end_date: str | None) -> tuple[int, int]:
+        lo = bisect_left(self.dates, start_date) if start_date else 0
+        hi = bisect_right(self.dates, end_date) if end_date else len(self.dates)
+        return lo, hi
+
+
+class MarketCapIndex:
+    """Market caps for one ticker, sorted by report period for point-in-time lookups."""
+
+    def __init__(self):
+        self.report_periods: list[str] = []
+        self.market_caps: list[float | None] = []
+
+    def add(self, metrics: list[FinancialMetrics]):
+        """Index the market cap of each financial metrics row, keeping the first row seen for a report period."""
+        for metric in metrics:
+            report_period = metric.report_period
+            index = bisect_left(self.report_periods, report_period)
+            if index < len(self.report_periods) and self.report_periods[index] == report_period:
+                continue
+            self.report_periods.insert(index, report_period)
+            self.market_caps.insert(index, metric.market_cap)
+
+    def latest(self, end_date: str) -> tuple[str, float | None] | None:
+        """The (report_period, market_cap) of the latest report on or before end_date."""
+        index = bisect_right(self.report_periods, end_date)
+        if index == 0:
+            return None
+        return self.report_periods[index - 1], self.market_caps[index - 1]
+
+
+class LineItemStore:
+    """
+    Line items for one ticker, merged across searches for different fields.
+
+    Rows are keyed by (period, report_period) and carry a presence map of the fields fetched for them, so a field
+    the API returned no value for is still known to have been asked for. Completed searches are remembered by
+    (period, end_date) with the report periods they returned, which is what lets a later search be answered locally.
+    """
+
+    BASE_FIELDS = ("ticker", "report_period", "period", "currency")
+
+    def __init__(self):
+        self.rows: dict[tuple[str, str], dict[str, any]] = {}
+        self.fields: dict[tuple[str, str], set[str]] = {}
+        # (period, end_date) -> (limit, report periods returned, newest first)
+        self.searches: dict[tuple[str, str], tuple[int, list[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _report_periods(self, period: str, end_date: str, limit: int) -> list[str] | None:
+        """Report periods a search would return, or None if no earlier search answers it."""
+        search = self.searches.get((period, end_date))
+        if search is None:
+            return None
+        searched_limit, report_periods = search
+        # A search that came back short of its limit returned everything there is
+        if searched_limit < limit and len(report_periods) == searched_limit:
+            return None
+        return report_periods[:limit]
+
+    def missing_fields(self, line_items: list[str], end_date: str, period: str, limit: int) -> list[str]:
+        """Fields that must be fetched to answer a search; all of them unless the report periods are already known."""
+        report_periods = self._report_periods(period, end_date, limit)
+        if report_periods is None:
+            return list(line_items)
+        return [field for field in line_items if any(field not in self.fields.get((period, report_period), ()) for report_period in report_periods)]
+
+    def merge(self, line_items: list[str], end_date: str, period: str, limit: int, data: list[dict[str, any]]):
+        """Merge the rows returned by a search for `line_items` into the store."""
+        for item in data:
+            key = (period, item["report_period"])
+            self.rows.setdefault(key, {}).update(item)
+            self.fields.setdefault(key, set()).update(line_items)
+        existing = self.searches.get((period, end_date))
+        # A search at the same limit replaces the earlier one, which is how a refetch after expiry refreshes it
+        if existing is None or existing[0] <= limit:
+            self.searches[(period, end_date)] = (limit, [item["report_period"] for item in data])
+
+    def get(self, line_items: list[str], end_date: str, period: str, limit: int) -> list[dict[str, any]] | None:
+        """Rows answering a search, restricted to the requested fields, or None if it cannot be answered locally."""
+        if self.missing_fields(line_items, end_date, period, limit):
+            return None
+        wanted = (*self.BASE_FIELDS, *line_items)
+        rows = [self.rows[(period, report_period)] for report_period in self._report_periods(period, end_date, limit)]
+        return [{field: row[field] for field in wanted if field in row} for row in rows]
+
+
+class RecordList:
+    """
+    Append-only records for one ticker, with a persistent index of their keys so merging a page costs O(page size).
+
+    Records are the validated pydantic models themselves, so reads hand them out without building or re-validating
+    anything, and the cache holds no second copy of each row as a dict.
+    """
+
+    def __init__(self, *key_fields: str):
+        self.key_fields = key_fields
+        self._key = attrgetter(*key_fields)
+        self.records: list[BaseModel] = []
+        self.keys: set = set()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def merge(self, data: list[BaseModel]) -> list[BaseModel]:
+        """Append the records whose key is not cached yet, keeping the first of any repeated within data, and return them."""
+        added = []
+        for item in data:
+            key = self._key(item)
+            if key not in self.keys:
+                # Adding the key right away also drops repeats within data, e.g. records at shard or page boundaries
+                self.keys.add(key)
+                added.append(item)
+        self.records.extend(added)
+        return added
+
+
+class CacheEntry:
+    """A ticker's cached data for one dataset, plus the bookkeeping needed to evict or expire it."""
+
+    __slots__ = ("value", "size", "fetched_at")
+
+    def __init__(self, value):
+        self.value = value
+        self.size = 0
+        # Unix timestamp of the last fetch that added to the data; None if unknown (e.g. loaded from a snapshot)
+        self.fetched_at: float | None = None
+
+
+class Cache:
+    """
+    In-memory cache for API responses, optionally backed by persistent storage.
+
+    Each dataset keeps its tickers in least-recently-used order. A dataset can be given a memory budget, past which
+    the least recently used tickers are evicted, and a TTL, after which data is refreshed. Expiry never throws away
+    history: for datasets tracked by date range, only the days that were recent when they were fetched (and so may
+    have changed since) are fetched again; financial metrics and line items stop answering lookups until refetched.
+    """
+
+    def __init__(
+        self,
+        backend: SQLiteCacheBackend | None = None,
+        memory_budgets: dict[str, int] | None = None,
+        ttls: dict[str, float] | None = None,
+    ):
+        self._backend = backend
+        # dataset -> approximate bytes it may hold in memory
+        self._memory_budgets: dict[str, int] = dict(memory_budgets or {})
+        # dataset -> seconds its data stays fresh
+        self._ttls: dict[str, float] = dict(ttls or {})
+        # dataset -> ticker -> entry, least recently used first
+        self._entries: dict[str, OrderedDict[str, CacheEntry]] = {dataset: OrderedDict() for dataset in DATASETS}
+        self._market_cap_index: dict[str, MarketCapIndex] = {}
+        # (dataset, ticker) -> sorted, non-overlapping (start_date, end_date, fetched_at) intervals already fetched in full
+        self._coverage: dict[tuple[str, str], list[tuple[str, str, float | None]]] = {}
+        # (dataset, ticker) pairs whose coverage has been read from the backend
+        self._coverage_loaded: set[tuple[str, str]] = set()
+        self._counters: dict[str, dict[str, int]] = {dataset: {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0} for dataset in DATASETS}
+        # Guards all of the above so fetchers running in worker threads can share the cache
+        self._lock = threading.RLock()
+
+    def set_backend(self, backend: SQLiteCacheBackend | None):
+        """Attach (or detach) a persistent backend. Data is loaded from it lazily per ticker."""
+        with self._lock:
+            self._backend = backend
+            for entries in self._entries.values():
+                entries.clear()
+            self._market_cap_index.clear()
+            self._coverage.clear()
+            self._coverage_loaded.clear()
+
+    def set_limits(self, memory_budgets: dict[str, int] | None = None, ttls: dict[str, float] | None = None):
+        """Set per-dataset memory budgets (approximate bytes) and TTLs (seconds), evicting anything now over budget."""
+        with self._lock:
+            self._memory_budgets = dict(memory_budgets or {})
+            self._ttls = dict(ttls or {})
+            for dataset in DATASETS:
+                self._enforce_budget(dataset)
+
+    def stats(self) -> dict[str, dict[str, any]]:
+        """Per-dataset entries (tickers held), approximate bytes, hits, misses, evictions and expirations."""
+        with self._lock:
+            return {
+                dataset: {
+                    "entries": sum(1 for entry in entries.values() if len(entry.value)),
+                    "approx_bytes": sum(entry.size for entry in entries.values()),
+                    "budget_bytes": self._memory_budgets.get(dataset),
+                    "ttl_seconds": self._ttls.get(dataset),
+                    **self._counters[dataset],
+                }
+                for dataset, entries in self._entries.items()
+            }
+
+    def export(self, path: str):
+        """
+        Write everything cached in memory to a directory of Parquet files, one per dataset plus one for coverage,
+        so other processes can start from a pre-warmed snapshot with load().
+        """
+        pa, pq = _import_pyarrow()
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            for dataset in _MODELS:
+                rows = [{"cache_ticker": ticker, **record.model_dump()} for ticker, entry in self._entries[dataset].items() for record in _records(entry.value)]
+                _write_parquet(pa, pq, os.path.join(path, f"{dataset}.parquet"), rows)
+
+            line_item_rows, line_item_searches = [], []
+            for ticker, entry in self._entries["line_items"].items():
+                store = entry.value
+                for (period, report_period), row in store.rows.items():
+                    line_item_rows.append({"cache_ticker": ticker, "period": period, "report_period": report_period, "fields": sorted(store.fields[(period, report_period)]), "row": json.dumps(row)})
+                for (period, end_date), (limit, report_periods) in store.searches.items():
+                    line_item_searches.append({"cache_ticker": ticker, "period": period, "end_date": end_date, "limit": limit, "report_periods": report_periods})
+            _write_parquet(pa, pq, os.path.join(path, "line_items.parquet"), line_item_rows)
+            _write_parquet(pa, pq, os.path.join(path, "line_item_searches.parquet"), line_item_searches)
+
+            coverage = [{"dataset": dataset, "cache_ticker": ticker, "start_date": start, "end_date": end, "fetched_at": fetched_at} for (dataset, ticker), intervals in self._coverage.items() for start, end, fetched_at in intervals]
+            _write_parquet(pa, pq, os.path.join(path, "coverage.parquet"), coverage)
+
+    def load(self, path: str):
+        """
+        Merge a snapshot written by export() into memory. Rows are converted into the cache's own models, so each
+        process holds its own copy, and the loaded data is not written to the persistent backend.
+        """
+        pa, pq = _import_pyarrow()
+        with self._lock:
+            for dataset, model in _MODELS.items():
+                records_by_ticker: dict[str, list[BaseModel]] = {}
+                for row in _read_parquet(pq, os.path.join(path, f"{dataset}.parquet")):
+                    # Rows were validated before they were exported
+                    records_by_ticker.setdefault(row.pop("cache_ticker"), []).append(model.model_construct(**row))
+                for ticker, records in records_by_ticker.items():
+                    self._add(dataset, ticker, self._entry(dataset, ticker), records, persist=False)
+
+            for row in _read_parquet(pq, os.path.join(path, "line_items.parquet")):
+                entry = self._entry("line_items", row["cache_ticker"])
+                key = (row["period"], row["report_period"])
+                values = json.loads(row["row"])
+                entry.value.rows.setdefault(key, {}).update(values)
+                entry.value.fields.setdefault(key, set()).update(row["fields"])
+                entry.size += _approx_size(values)
+            for row in _read_parquet(pq, os.path.join(path, "line_item_searches.parquet")):
+                searches = self._entry("line_items", row["cache_ticker"]).value.searches
+                existing = searches.get((row["period"], row["end_date"]))
+                if existing is None or existing[0] < row["limit"]:
+                    searches[(row["period"], row["end_date"])] = (row["limit"], row["report_periods"])
+            self._enforce_budget("line_items")
+
+            for row in _read_parquet(pq, os.path.join(path, "coverage.parquet")):
+                key = (row["dataset"], row["cache_ticker"])
+                self._coverage[key] = _add_interval(self._get_coverage(*key), row["start_date"], row["end_date"], row.get("fetched_at"))
+
+    def _entry(self, dataset: str, ticker: str) -> CacheEntry:
+        """Get a ticker's entry, marking it most recently used and (re)loading it from the backend if needed."""
+        entries = self._entries[dataset]
+        entry = entries.get(ticker)
+        if entry is None:
+            entry = entries[ticker] = CacheEntry(_empty_value(dataset))
+            if self._backend is not None and (stored := self._backend.load(dataset, ticker)):
+                if model := _MODELS.get(dataset):
+                    # Stored rows were validated when they were fetched
+                    stored = [model.model_construct(**row) for row in stored]
+                self._add(dataset, ticker, entry, stored, persist=False)
+                # Reloaded data keeps the age it had, so the TTL still applies to what an earlier run fetched
+                entry.fetched_at = self._backend.load_fetched_at(dataset, ticker)
+        entries.move_to_end(ticker)
+        return entry
+
+    def _lookup(self, dataset: str, ticker: str, count: bool = True) -> CacheEntry | None:
+        """
+        Like _entry, but counts the access as a hit or a miss unless count is False. Returns None when the data of a
+        dataset without date coverage has outlived its TTL; it is kept, but the caller should refetch.
+        """
+        entry = self._entry(dataset, ticker)
+        expired = dataset not in _COVERED_DATASETS and len(entry.value) and self._expired(dataset, entry.fetched_at)
+        if expired:
+            self._counters[dataset]["expirations"] += 1
+        if count:
+            self._counters[dataset]["hits" if len(entry.value) and not expired else "misses"] += 1
+        return None if expired else entry
+
+    def _expired(self, dataset: str, fetched_at: float | None) -> bool:
+        """Whether data fetched at fetched_at (None: at an unknown time) has outlived the dataset's TTL."""
+        ttl = self._ttls.get(dataset)
+        return ttl is not None and time.time() - (fetched_at or 0) > ttl
+
+    def _add(self, dataset: str, ticker: str, entry: CacheEntry, data: list, persist: bool = True):
+        """Merge new data into an entry, write what was new through to the backend and account for its size."""
+        if dataset == "line_items":
+            added = [row for search in data for row in search["results"]]
+            for search in data:
+                entry.value.merge(search["line_items"], search["end_date"], search["period"], search["limit"], search["results"])
+        else:
+            added = entry.value.merge(data)
+            if dataset == "financial_metrics" and (index := self._market_cap_index.get(ticker)):
+                index.add(added)
+
+        if persist:
+            entry.fetched_at = time.time()
+            if self._backend is not None:
+                self._backend.append(dataset, ticker, data if dataset == "line_items" else [record.model_dump() for record in added])
+                self._backend.save_fetched_at(dataset, ticker, entry.fetched_at)
+        entry.size += sum(_approx_size(record) for record in added)
+        self._enforce_budget(dataset)
+
+    def _enforce_budget(self, dataset: str):
+        """Evict least recently used tickers until the dataset fits its budget, always keeping the newest one."""
+        if (budget := self._memory_budgets.get(dataset)) is None:
+            return
+        entries = self._entries[dataset]
+        total = sum(entry.size for entry in entries.values())
+        while total > budget and len(entries) > 1:
+            ticker = next(iter(entries))
+            total -= entries[ticker].size
+            self._drop(dataset, ticker)
+
+    def _drop(self, dataset: str, ticker: str):
+        """Evict a ticker's data, along with the coverage and indexes that describe it."""
+        del self._entries[dataset][ticker]
+        self._counters[dataset]["evictions"] += 1
+        # Without the data the coverage no longer holds; with a backend both are reloaded next time
+        self._coverage.pop((dataset, ticker), None)
+        self._coverage_loaded.discard((dataset, ticker))
+        if dataset == "financial_metrics":
+            self._market_cap_index.pop(ticker, None)
+
+    def _get_coverage(self, dataset: str, ticker: str) -> list[tuple[str, str, float | None]]:
+        """A ticker's coverage intervals, without the days that have expired since they were fetched."""
+        key = (dataset, ticker)
+        if self._backend is not None and key not in self._coverage_loaded:
+            self._coverage_loaded.add(key)
+            intervals = self._backend.load_coverage(dataset, ticker)
+            for start, end, fetched_at in self._coverage.get(key, []):
+                intervals = _add_interval(intervals, start, end, fetched_at)
+            self._coverage[key] = intervals
+
+        intervals = self._coverage.get(key, [])
+        if (ttl := self._ttls.get(dataset)) is not None and (unexpired := _expire_intervals(intervals, ttl)) != intervals:
+            self._counters[dataset]["expirations"] += 1
+            self._coverage[key] = intervals = unexpired
+            if self._backend is not None:
+                self._backend.save_coverage(dataset, ticker, intervals)
+        return intervals
+
+    def get_missing_ranges(self, dataset: str, ticker: str, start_date: str, end_date: str) -> list[tuple[str, str]]:
+        """
+        Return the sub-ranges of [start_date, end_date] that have not been fetched yet, oldest first.
+
+        This is where a date range lookup counts as a hit (nothing missing) or a miss, since the reads that follow
+        only happen once the gaps are filled.
+        """
+        with self._lock:
+            missing = self._missing_ranges(dataset, ticker, start_date, end_date)
+            self._counters[dataset]["misses" if missing else "hits"] += 1
+            return missing
+
+    def _missing_ranges(self, dataset: str, ticker: str, start_date: str, end_date: str) -> list[tuple[str, str]]:
+        if start_date > end_date:
+            return []
+        # Touch the entry so the ticker's data is loaded and kept alongside its coverage
+        self._entry(dataset, ticker)
+        missing = []
+        cursor = start_date
+        for covered_start, covered_end, _ in self._get_coverage(dataset, ticker):
+            if covered_end < cursor:
+                continue
+            if covered_start > end_date:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, _shift_date(covered_start, -1)))
+            cursor = _shift_date(covered_end, 1)
+            if cursor > end_date:
+                return missing
+        missing.append((cursor, end_date))
+        return missing
+
+    def add_coverage(self, dataset: str, ticker: str, start_date: str, end_date: str):
+        """Record that every row of a dataset in [start_date, end_date] has been fetched for a ticker."""
+        with self._lock:
+            if start_date > end_date:
+                return
+            intervals = _add_interval(self._get_coverage(dataset, ticker), start_date, end_date, time.time())
+            self._coverage[(dataset, ticker)] = intervals
+            if self._backend is not None:
+                self._backend.save_coverage(dataset, ticker, intervals)
+
+    def get_high_water_mark(self, dataset: str, ticker: str, end_date: str) -> str | None:
+        """Return the newest date fetched for a ticker without gaps, from coverage that starts on or before end_date."""
+        with self._lock:
+            # Touch the entry so the ticker's data is loaded and kept alongside its coverage
+            self._entry(dataset, ticker)
+            # Adjacent intervals fetched at different times still count as one run without gaps
+            marks = [covered_end for covered_start, covered_end in _merge_intervals(self._get_coverage(dataset, ticker)) if covered_start <= end_date]
+            return marks[-1] if marks else None
+
+    def get_prices(self, ticker: str, start_date: str | None = None, end_date: str | None = None) -> list[Price]:
+        """Get cached prices dated within [start_date, end_date], oldest first. Hits and misses are counted by get_missing_ranges."""
+        with self._lock:
+            return self._entry("prices", ticker).value.between(start_date, end_date)
+
+    def get_prices_df(self, ticker: str, start_date: str | None = None, end_date: str | None = None) -> pd.DataFrame:
+        """Get cached prices dated within [start_date, end_date] as a read-only slice of the ticker's price frame."""
+        with self._lock:
+            return self._entry("prices", ticker).value.frame_between(start_date, end_date)
+
+    def set_prices(self, ticker: str, data: list[Price]):
+        """Add new prices to cache."""
+        with self._lock:
+            self._add("prices", ticker, self._entry("prices", ticker), data)
+
+    def get_financial_metrics(self, ticker: str) -> list[FinancialMetrics] | None:
+        """Get cached financial metrics if available and not expired."""
+        with self._lock:
+            if (entry := self._lookup("financial_metrics", ticker)) is None:
+                return None
+            return entry.value.records or None
+
+    def set_financial_metrics(self, ticker: str, data: list[FinancialMetrics]):
         """Append new financial metrics to cache."""
-        self._financial_metrics_cache[ticker] = self._merge_data(self._financial_metrics_cache.get(ticker), data, key_field="report_period")
+        with self._lock:
+            self._add("financial_metrics", ticker, self._entry("financial_metrics", ticker), data)
 
-    def get_line_items(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached line items if available."""
-        return self._line_items_cache.get(ticker)
+    def get_market_cap(self, ticker: str, end_date: str) -> tuple[str, float | None] | None:
+        """Get the (report_period, market_cap) of the latest cached financial metrics on or before end_date."""
+        with self._lock:
+            if (entry := self._lookup("financial_metrics", ticker)) is None:
+                return None
+            index = self._market_cap_index.get(ticker)
+            if index is None:
+                index = self._market_cap_index[ticker] = MarketCapIndex()
+                index.add(entry.value.records)
+            return index.latest(end_date)
 
-    def set_line_items(self, ticker: str, data: list[dict[str, any]]):
-        """Append new line items to cache."""
-        self._line_items_cache[ticker] = self._merge_data(self._line_items_cache.get(ticker), data, key_field="report_period")
+    def get_missing_line_items(self, ticker: str, line_items: list[str], end_date: str, period: str, limit: int) -> list[str]:
+        """Get the line items that have to be fetched before a search can be answered from cache."""
+        with self._lock:
+            if (entry := self._lookup("line_items", ticker)) is None:
+                return list(line_items)
+            return entry.value.missing_fields(line_items, end_date, period, limit)
 
-    def get_insider_trades(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached insider trades if available."""
-        return self._insider_trades_cache.get(ticker)
+    def get_line_items(self, ticker: str, line_items: list[str], end_date: str, period: str, limit: int) -> list[dict[str, any]] | None:
+        """Get cached line items for a search if every requested field is cached for its report periods."""
+        with self._lock:
+            return self._entry("line_items", ticker).value.get(line_items, end_date, period, limit)
 
-    def set_insider_trades(self, ticker: str, data: list[dict[str, any]]):
+    def set_line_items(self, ticker: str, line_items: list[str], end_date: str, period: str, limit: int, data: list[dict[str, any]]):
+        """Add the results of a line item search to cache."""
+        with self._lock:
+            search = {"line_items": line_items, "end_date": end_date, "period": period, "limit": limit, "results": data}
+            self._add("line_items", ticker, self._entry("line_items", ticker), [search])
+
+    def get_insider_trades(self, ticker: str, count: bool = True) -> list[InsiderTrade] | None:
+        """Get cached insider trades if available. Pass count=False for reads after get_missing_ranges, which already counted the lookup."""
+        with self._lock:
+            return self._lookup("insider_trades", ticker, count).value.records or None
+
+    def set_insider_trades(self, ticker: str, data: list[InsiderTrade]):
         """Append new insider trades to cache."""
-        self._insider_trades_cache[ticker] = self._merge_data(self._insider_trades_cache.get(ticker), data, key_field="filing_date")  # Could also use transaction_date if preferred
+        with self._lock:
+            self._add("insider_trades", ticker, self._entry("insider_trades", ticker), data)
 
-    def get_company_news(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached company news if available."""
-        return self._company_news_cache.get(ticker)
+    def get_company_news(self, ticker: str, count: bool = True) -> list[CompanyNews] | None:
+        """Get cached company news if available. Pass count=False for reads after get_missing_ranges, which already counted the lookup."""
+        with self._lock:
+            return self._lookup("company_news", ticker, count).value.records or None
 
-    def set_company_news(self, ticker: str, data: list[dict[str, any]]):
+    def set_company_news(self, ticker: str, data: list[CompanyNews]):
         """Append new company news to cache."""
-        self._company_news_cache[ticker] = self._merge_data(self._company_news_cache.get(ticker), data, key_field="date")
+        with self._lock:
+            self._add("company_news", ticker, self._entry("company_news", ticker), data)
+
+
+def _empty_value(dataset: str):
+    if dataset == "prices":
+        return PriceSeries()
+    if dataset == "line_items":
+        return LineItemStore()
+    return RecordList(*_KEY_FIELDS[dataset])
+
+
+def _records(value) -> list[BaseModel]:
+    return value.prices if isinstance(value, PriceSeries) else value.records
+
+
+def _import_pyarrow():
+    """pyarrow is only needed to export or load cache snapshots, so it is an optional dependency."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Exporting or loading the data cache requires pyarrow. Install it with: poetry install --extras parquet") from None
+    return pa, pq
+
+
+def _write_parquet(pa, pq, path: str, rows: list[dict[str, any]]):
+    """Write rows as a Parquet file, one column per key; an existing file is removed if there is nothing to write."""
+    if not rows:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    pq.write_table(pa.table({column: [row.get(column) for row in rows] for column in columns}), path)
+
+
+def _read_parquet(pq, path: str) -> list[dict[str, any]]:
+    if not os.path.exists(path):
+        return []
+    return pq.read_table(path).to_pylist()
+
+
+def prices_frame(prices: list[Price]) -> pd.DataFrame:
+    """Build a typed DataFrame of prices indexed by date, oldest first, straight from the model attributes."""
+    times = [price.time for price in prices]
+    df = pd.DataFrame(
+        {
+            "open": pd.to_numeric([price.open for price in prices], errors="coerce"),
+            "close": pd.to_numeric([price.close for price in prices], errors="coerce"),
+            "high": pd.to_numeric([price.high for price in prices], errors="coerce"),
+            "low": pd.to_numeric([price.low for price in prices], errors="coerce"),
+            "volume": pd.to_numeric([price.volume for price in prices], errors="coerce"),
+            "time": times,
+        },
+        index=pd.DatetimeIndex(pd.to_datetime(times), name="Date"),
+    )
+    return df if df.index.is_monotonic_increasing else df.sort_index()
+
+
+def _approx_size(record) -> int:
+    """Rough memory footprint of a cached record: the object plus its field values (field names are shared)."""
+    fields = record if isinstance(record, dict) else vars(record)
+    size = sys.getsizeof(record) + sum(sys.getsizeof(value) for value in fields.values())
+    return size if fields is record else size + sys.getsizeof(fields)
+
+
+def _shift_date(date: str, days: int) -> str:
+    return (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _merge_intervals(intervals: list[tuple]) -> list[tuple[str, str]]:
+    """Sort date intervals (start_date, end_date, ...) and collapse overlapping or adjacent ones into (start_date, end_date)."""
+    merged: list[tuple[str, str]] = []
+    for start, end, *_ in sorted(intervals):
+        if merged and start <= _shift_date(merged[-1][1], 1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+
+def _add_interval(intervals: list[tuple[str, str, float | None]], start_date: str, end_date: str, fetched_at: float | None) -> list[tuple[str, str, float | None]]:
+    """
+    Add a fetched (start_date, end_date, fetched_at) interval to sorted, non-overlapping coverage. It replaces whatever
+    it overlaps, since that was just fetched again, and merges with neighbours fetched at the same time.
+    """
+    pieces = []
+    for start, end, piece_fetched_at in intervals:
+        if end < start_date or start > end_date:
+            pieces.append((start, end, piece_fetched_at))
+            continue
+        if start < start_date:
+            pieces.append((start, _shift_date(start_date, -1), piece_fetched_at))
+        if end > end_date:
+            pieces.append((_shift_date(end_date, 1), end, piece_fetched_at))
+    pieces.append((start_date, end_date, fetched_at))
+
+    merged: list[tuple[str, str, float | None]] = []
+    for start, end, piece_fetched_at in sorted(pieces, key=lambda piece: piece[0]):
+        if merged and merged[-1][2] == piece_fetched_at and start <= _shift_date(merged[-1][1], 1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end), piece_fetched_at)
+        else:
+            merged.append((start, end, piece_fetched_at))
+    return merged
+
+
+def _expire_intervals(intervals: list[tuple[str, str, float | None]], ttl: float) -> list[tuple[str, str, float | None]]:
+    """
+    Drop the days of each interval fetched more than ttl seconds ago that were within ttl of their fetch time. Those
+    days were recent when fetched, so late news, filings or revisions may have arrived since; older days are settled
+    and stay covered. Intervals fetched at an unknown time expire entirely.
+    """
+    now = time.time()
+    unexpired = []
+    for start, end, fetched_at in intervals:
+        if fetched_at is not None and now - fetched_at <= ttl:
+            unexpired.append((start, end, fetched_at))
+            continue
+        settled_end = min(end, _shift_date(datetime.fromtimestamp(fetched_at - ttl).strftime("%Y-%m-%d"), -1)) if fetched_at is not None else None
+        if settled_end is not None and settled_end >= start:
+            unexpired.append((start, settled_end, fetched_at))
+    return unexpired
+
+
+DATASETS = ("prices", "financial_metrics", "line_items", "insider_trades", "company_news")
+
+# Datasets whose completeness is tracked as coverage of date ranges
+_COVERED_DATASETS = ("prices", "insider_trades", "company_news")
+
+# Model each dataset's records are cached as (line items are kept as merged field dicts)
+_MODELS = {
+    "prices": Price,
+    "financial_metrics": FinancialMetrics,
+    "insider_trades": InsiderTrade,
+    "company_news": CompanyNews,
+}
+
+# Fields used to de-duplicate records of each dataset
+_KEY_FIELDS = {
+    # ttm and annual metrics share report periods, so the period is part of the key
+    "financial_metrics": ("period", "report_period"),
+    # Many trades are filed on the same day, so a trade is identified by who traded what, when and at what price
+    "insider_trades": ("filing_date", "name", "transaction_date", "transaction_shares", "transaction_price_per_share"),
+    "company_news": ("date", "url"),
+}
 
 
 # Global cache instance
@@ -69,3 +754,37 @@ _cache = Cache()
 def get_cache() -> Cache:
     """Get the global cache instance."""
     return _cache
+
+
+def configure_cache(
+    path: str | None = None,
+    memory_budgets: dict[str, int] | None = None,
+    ttls: dict[str, float] | None = None,
+):
+    """
+    Configure the global cache.
+
+    Args:
+        path: SQLite file to persist the cache to; in memory only if not given
+        memory_budgets: Approximate bytes each dataset may hold in memory (default: DATA_CACHE_MEMORY_BUDGETS_MB)
+        ttls: Seconds each dataset's data stays fresh (default: DATA_CACHE_TTLS_SECONDS)
+    """
+    if memory_budgets is None:
+        memory_budgets = {dataset: int(megabytes * 1024 * 1024) for dataset, megabytes in _parse_dataset_values(os.environ.get("DATA_CACHE_MEMORY_BUDGETS_MB")).items()}
+    if ttls is None:
+        ttls = _parse_dataset_values(os.environ.get("DATA_CACHE_TTLS_SECONDS"))
+    _cache.set_backend(SQLiteCacheBackend(path) if path else None)
+    _cache.set_limits(memory_budgets, ttls)
+
+
+def _parse_dataset_values(value: str | None) -> dict[str, float]:
+    """Parse "dataset=number,..." settings, e.g. "company_news=3600,insider_trades=86400"."""
+    parsed = {}
+    for part in (value or "").split(","):
+        if not part.strip():
+            continue
+        dataset, _, number = part.partition("=")
+        if dataset.strip() not in DATASETS:
+            raise ValueError(f"Unknown cache dataset: {dataset.strip()}. Expected one of {', '.join(DATASETS)}")
+        parsed[dataset.strip()] = float(number)
+    return parsed
@@ -0,0 +1,123 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+from data.models import CompanyNews, FinancialMetrics, InsiderTrade, LineItem, Price
+from tools import api
+
+# The largest limits agents ask for; smaller requests are served as the newest slice of one fetch at these limits
+FINANCIAL_METRICS_LIMIT = 10
+INSIDER_TRADES_LIMIT = 1000
+COMPANY_NEWS_LIMIT = 100
+
+# Datasets load() can fetch for every ticker; analysts declare which of them they read in utils.analysts
+SNAPSHOT_DATASETS = ("prices", "market_cap", "insider_trades", "company_news", "financial_metrics_ttm", "financial_metrics_annual")
+
+
+class MarketSnapshot:
+    """
+    Point-in-time market data for one run. Every agent looks at the same tickers as of the same end date,
+    so the data is loaded once when the graph starts and each agent reads it from here.
+    """
+
+    def __init__(self, tickers: list[str], start_date: str, end_date: str):
+        self.tickers = list(tickers)
+        self.start_date = start_date
+        self.end_date = end_date
+        self._lock = threading.Lock()
+        self._results: dict[tuple, Future] = {}
+
+    @classmethod
+    def build(
+        cls,
+        tickers: list[str],
+        start_date: str,
+        end_date: str,
+        line_item_searches: list[dict] | None = None,
+        datasets: list[str] | None = None,
+        max_concurrency: int | None = None,
+    ) -> "MarketSnapshot":
+        """Create a snapshot and load the data agents will read from it."""
+        snapshot = cls(tickers, start_date, end_date)
+        snapshot.load(line_item_searches, datasets, max_concurrency)
+        return snapshot
+
+    def load(self, line_item_searches: list[dict] | None = None, datasets: list[str] | None = None, max_concurrency: int | None = None):
+        """
+        Fetch the given SNAPSHOT_DATASETS (all of them by default) for every ticker concurrently, with line items
+        batched into one search per period. Anything not loaded here is still fetched when an agent first reads it.
+
+        Failures are not raised here: the dataset is fetched again, and the error raised, when an agent reads it.
+        """
+        loaders = {
+            "prices": self.get_prices,
+            "market_cap": self.get_market_cap,
+            "insider_trades": self.get_insider_trades,
+            "company_news": self.get_company_news,
+            "financial_metrics_ttm": lambda ticker: self.get_financial_metrics(ticker, period="ttm"),
+            "financial_metrics_annual": lambda ticker: self.get_financial_metrics(ticker, period="annual"),
+        }
+        max_concurrency = max_concurrency or int(os.environ.get("FINANCIAL_DATASETS_MAX_CONCURRENCY", 8))
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            for search in line_item_searches or []:
+                executor.submit(api.search_line_items_bulk, self.tickers, end_date=self.end_date, **search)
+            for ticker in self.tickers:
+                for dataset in SNAPSHOT_DATASETS if datasets is None else datasets:
+                    executor.submit(loaders[dataset], ticker)
+
+    def get_prices(self, ticker: str) -> list[Price]:
+        """Daily prices over the run's date range, oldest first."""
+        return list(self._get(("prices", ticker), lambda: api.get_prices(ticker, self.start_date, self.end_date)))
+
+    def get_price_data(self, ticker: str) -> pd.DataFrame:
+        """Daily prices over the run's date range as a read-only DataFrame."""
+        return self._get(("price_data", ticker), lambda: api.get_price_data(ticker, self.start_date, self.end_date))
+
+    def get_financial_metrics(self, ticker: str, period: str = "ttm", limit: int = FINANCIAL_METRICS_LIMIT) -> list[FinancialMetrics]:
+        """The newest financial metrics reported by the end date."""
+        return self._newest(("financial_metrics", ticker, period), limit, FINANCIAL_METRICS_LIMIT, lambda fetch_limit: api.get_financial_metrics(ticker, self.end_date, period, fetch_limit))
+
+    def search_line_items(self, ticker: str, line_items: list[str], period: str = "ttm", limit: int = 10) -> list[LineItem]:
+        """Line items reported by the end date, served from the searches batched when the snapshot was loaded."""
+        return list(self._get(("line_items", ticker, tuple(line_items), period, limit), lambda: api.search_line_items(ticker, line_items, self.end_date, period, limit)))
+
+    def get_market_cap(self, ticker: str) -> float | None:
+        """Market cap as of the end date."""
+        return self._get(("market_cap", ticker), lambda: api.get_market_cap(ticker, self.end_date))
+
+    def get_insider_trades(self, ticker: str, limit: int = INSIDER_TRADES_LIMIT) -> list[InsiderTrade]:
+        """The newest insider trades filed by the end date."""
+        return self._newest(("insider_trades", ticker), limit, INSIDER_TRADES_LIMIT, lambda fetch_limit: api.get_insider_trades(ticker, self.end_date, limit=fetch_limit))
+
+    def get_company_news(self, ticker: str, limit: int = COMPANY_NEWS_LIMIT) -> list[CompanyNews]:
+        """The newest company news published by the end date."""
+        return self._newest(("company_news", ticker), limit, COMPANY_NEWS_LIMIT, lambda fetch_limit: api.get_company_news(ticker, self.end_date, limit=fetch_limit))
+
+    def _newest(self, key: tuple, limit: int, default_limit: int, fetch) -> list:
+        """Serve the newest `limit` records as a slice of one fetch at the default limit, or fetch more if asked for."""
+        fetch_limit = max(limit, default_limit)
+        return self._get(key + (fetch_limit,), lambda: fetch(fetch_limit))[:limit]
+
+    def _get(self, key: tuple, fetch):
+        """Return the result for a key, fetching it once even when agents ask for it concurrently."""
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            # Forget the failure so the next reader tries again
+            with self._lock:
+                del self._results[key]
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class MemoryResponseBackend:
+    """Keeps LLM responses in a dict for the lifetime of the process."""
+
+    def __init__(self):
+        self._responses: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            return self._responses.get(key)
+
+    def set(self, key: str, response: dict):
+        with self._lock:
+            self._responses[key] = response
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+
+class DiskResponseBackend:
+    """Keeps LLM responses as one JSON file per prompt under a directory, so re-runs reuse them across processes."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def set(self, key: str, response: dict):
+        path = self._path(key)
+        # Write then rename so concurrent agents never leave a half-written response behind
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(response, f)
+        os.replace(temp_path, path)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.directory, name))
+
+
+class LLMResponseCache:
+    """Content-addressed cache of structured LLM responses, keyed by model, provider, rendered prompt and output schema."""
+
+    def __init__(self, backend=None, enabled: bool = True):
+        self.backend = backend or MemoryResponseBackend()
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def key(self, model_name: str, model_provider: str, prompt: Any, pydantic_model: type[BaseModel]) -> str:
+        """Hash everything that determines a response; any change to the prompt or schema gives a new key."""
+        content = {
+            "model_name": model_name,
+            "model_provider": str(getattr(model_provider, "value", model_provider)),
+            "messages": _render_messages(prompt),
+            "schema": pydantic_model.model_json_schema(),
+        }
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str, pydantic_model: type[BaseModel]) -> BaseModel | None:
+        """Return the cached response for a key, or None if there is none (or it no longer fits the schema)."""
+        if not self.enabled:
+            return None
+        result = None
+        if (response := self.backend.get(key)) is not None:
+            try:
+                result = pydantic_model.model_validate(response)
+            except ValueError:
+                pass
+        with self._lock:
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return result
+
+    def set(self, key: str, result: BaseModel):
+        if self.enabled:
+            self.backend.set(key, result.model_dump(mode="json"))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"enabled": self.enabled, "hits": self._hits, "misses": self._misses}
+
+
+def _render_messages(prompt: Any) -> list:
+    """Render a prompt (a prompt value, a list of messages or a string) as (role, content) pairs."""
+    if hasattr(prompt, "to_messages"):
+        prompt = prompt.to_messages()
+    if isinstance(prompt, str):
+        return [("human", prompt)]
+    if isinstance(prompt, (list, tuple)):
+        return [(message.type, message.content) if hasattr(message, "content") else message for message in prompt]
+    return [str(prompt)]
+
+
+# Global LLM response cache instance
+_llm_cache = LLMResponseCache()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get the global LLM response cache instance."""
+    return _llm_cache
+
+
+def configure_llm_cache(path: str | None = None, enabled: bool = True):
+    """
+    Configure the global LLM response cache: responses are kept on disk under path if one is given
+    (default: LLM_CACHE_PATH), otherwise in memory. enabled=False turns caching off altogether.
+    """
+    path = path or os.environ.get("LLM_CACHE_PATH")
+    _llm_cache.backend = DiskResponseBackend(path) if path else MemoryResponseBackend()
+    _llm_cache.enabled = enabled
@@ -1,9 +1,11 @@
 import os
+import threading
 from langchain_anthropic import ChatAnthropic
 from langchain_deepseek import ChatDeepSeek
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_groq import ChatGroq
 from langchain_openai import ChatOpenAI
+from llm.stub import StubChatModel
 from enum import Enum
 from pydantic import BaseModel
 from typing import Tuple
@@ -16,6 +18,7 @@ class ModelProvider(str, Enum):
     GEMINI = "Gemini"
     GROQ = "Groq"
     OPENAI = "OpenAI"
+    STUB = "Stub"
 
 
 
@@ -104,6 +107,11 @@ AVAILABLE_MODELS = [
         model_name="o3-mini",
         provider=ModelProvider.OPENAI
     ),
+    LLMModel(
+        display_name="[stub] offline (deterministic, no API key)",
+        model_name="stub",
+        provider=ModelProvider.STUB
+    ),
 ]
 
 # Create LLM_ORDER in the format expected by the UI
@@ -113,7 +121,7 @@ def get_model_info(model_name: str) -> LLMModel | None:
     """Get model information by model_name"""
     return next((model for model in AVAILABLE_MODELS if model.model_name == model_name), None)
 
-def get_model(model_name: str, model_provider: ModelProvider) -> ChatOpenAI | ChatGroq | None:
+def get_model(model_name: str, model_provider: ModelProvider) -> ChatOpenAI | ChatGroq | StubChatModel | None:
     if model_provider == ModelProvider.GROQ:
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
@@ -146,4 +154,46 @@ def get_model(model_name: str, model_provider: ModelProvider) -> ChatOpenAI | Ch
         if not api_key:
             print(f"API Key Error: Please make sure GOOGLE_API_KEY is set in your .env file.")
             raise ValueError("Google API key not found.  Please make sure GOOGLE_API_KEY is set in your .env file.")
-        return ChatGoogleGenerativeAI(model=model_name, api_key=api_key)
\ No newline at end of file
+        return ChatGoogleGenerativeAI(model=model_name, api_key=api_key)
+    elif model_provider == ModelProvider.STUB:
+        return StubChatModel(model_name)
+
+
+class ModelRegistry:
+    """
+    Process-wide pool of chat model clients keyed by (provider, model, structured output schema). Each client
+    is built once and then shared, together with its HTTP connection pool, by every call and thread.
+    """
+
+    def __init__(self):
+        self._clients: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str, model_provider: ModelProvider, pydantic_model: type[BaseModel] | None = None):
+        """Get the client for a model, wrapped for structured output in pydantic_model's schema if the model has JSON mode."""
+        model_info = get_model_info(model_name)
+        if model_info and not model_info.has_json_mode():
+            # Models without JSON mode return raw text for the caller to parse, so one client serves every schema
+            pydantic_model = None
+        key = (ModelProvider(model_provider), model_name, pydantic_model)
+
+        with self._lock:
+            if (client := self._clients.get(key)) is None:
+                client = get_model(model_name, model_provider)
+                if pydantic_model is not None:
+                    client = client.with_structured_output(pydantic_model, method="json_mode")
+                self._clients[key] = client
+            return client
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+
+# Global model registry instance
+_model_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the global model registry instance."""
+    return _model_registry
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import random
+import time
+import types
+import typing
+from typing import Any
+
+from langchain_core.messages import AIMessage
+from pydantic import BaseModel
+
+
+class StubChatModel:
+    """
+    Offline stand-in for a chat model: answers every prompt with a schema-valid response derived from a hash
+    of the prompt, so the same prompt always gets the same answer. Needs no network access or API key, which
+    makes it suitable for benchmarks, CI and trying out the graph.
+    """
+
+    def __init__(self, model_name: str = "stub", latency: str | None = None):
+        self.model_name = model_name
+        # Artificial latency per call in milliseconds, fixed ("200") or drawn from a range ("100-300")
+        latency = latency if latency is not None else os.environ.get("STUB_LLM_LATENCY_MS", "0")
+        low, _, high = str(latency).partition("-")
+        self.latency_ms = (float(low), float(high or low))
+
+    def with_structured_output(self, schema: type[BaseModel], method: str | None = None) -> "StructuredStubChatModel":
+        return StructuredStubChatModel(self, schema)
+
+    def invoke(self, prompt: Any) -> AIMessage:
+        rng = self._sleep(prompt)
+        return AIMessage(content=f"Stub response {rng.getrandbits(32):08x}")
+
+    def _sleep(self, prompt: Any, schema: type[BaseModel] | None = None) -> random.Random:
+        """Wait out the artificial latency and return a random generator seeded by the prompt and schema."""
+        seed = json.dumps([self.model_name, _render(prompt), schema.__name__ if schema else None])
+        rng = random.Random(hashlib.sha256(seed.encode("utf-8")).digest())
+        if (latency_ms := rng.uniform(*self.latency_ms)) > 0:
+            time.sleep(latency_ms / 1000)
+        return rng
+
+
+class StructuredStubChatModel:
+    """A StubChatModel bound to an output schema, as returned by with_structured_output."""
+
+    def __init__(self, model: StubChatModel, schema: type[BaseModel]):
+        self.model = model
+        self.schema = schema
+
+    def invoke(self, prompt: Any) -> BaseModel:
+        rng = self.model._sleep(prompt, self.schema)
+        # Dicts are keyed like the first JSON object in the prompt, which for every prompt here is keyed by ticker
+        keys = _first_json_keys(prompt) or ["key"]
+        return self.schema.model_validate(_fake(self.schema, rng, keys))
+
+
+def _fake(annotation: Any, rng: random.Random, keys: list[str]) -> Any:
+    """Generate a value that validates against a type annotation."""
+    origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        if "root" in annotation.model_fields and len(annotation.model_fields) == 1:
+            return _fake(annotation.model_fields["root"].annotation, rng, keys)
+        return {name: _fake(field.annotation, rng, keys) for name, field in annotation.model_fields.items()}
+    if origin is typing.Literal:
+        return rng.choice(args)
+    if origin in (typing.Union, types.UnionType):
+        return _fake(next((arg for arg in args if arg is not type(None)), None), rng, keys)
+    if origin is dict:
+        return {key: _fake(args[1] if args else str, rng, keys) for key in keys}
+    if origin in (list, tuple, set):
+        return [_fake(args[0] if args else str, rng, keys)]
+    if annotation is bool:
+        return rng.random() < 0.5
+    if annotation is int:
+        return rng.randint(0, 100)
+    if annotation is float:
+        return round(rng.uniform(0, 100), 1)
+    if annotation is str:
+        return f"Stub response {rng.getrandbits(32):08x}"
+    return None
+
+
+def _render(prompt: Any) -> str:
+    """Render a prompt (a prompt value, a list of messages or a string) as text."""
+    if hasattr(prompt, "to_string"):
+        return prompt.to_string()
+    if isinstance(prompt, (list, tuple)):
+        return "\n".join(str(getattr(message, "content", message)) for message in prompt)
+    return str(prompt)
+
+
+def _first_json_keys(prompt: Any) -> list[str]:
+    """Keys of the first JSON object embedded in the prompt, or [] if it has none."""
+    text, decoder = _render(prompt), json.JSONDecoder()
+    start = text.find("{")
+    while start != -1:
+        try:
+            value, _ = decoder.raw_decode(text, start)
+            if isinstance(value, dict) and value:
+                return list(value)
+        except ValueError:
+            pass
+        start = text.find("{", start + 1)
+    return []
@@ -1,3 +1,4 @@
+import os
 import sys
 
 from dotenv import load_dotenv
@@ -15,10 +16,14 @@ from agents.sentiment import sentiment_agent
 from agents.warren_buffett import warren_buffett_agent
 from graph.state import AgentState
 from agents.valuation import valuation_agent
-from utils.display import print_trading_output
-from utils.analysts import ANALYST_ORDER, get_analyst_nodes
+from utils.display import print_api_metrics, print_trading_output
+from utils.analysts import ANALYST_ORDER, get_analyst_nodes, plan_line_item_searches, plan_snapshot_datasets
+from data.snapshot import MarketSnapshot
+from tools.metrics import get_api_metrics
 from utils.progress import progress
 from llm.models import LLM_ORDER, get_model_info
+from llm.cache import configure_llm_cache
+from data.cache import configure_cache
 
 import argparse
 from datetime import datetime
@@ -89,6 +94,7 @@ def run_hedge_fund(
                     "show_reasoning": show_reasoning,
                     "model_name": model_name,
                     "model_provider": model_provider,
+                    "selected_analysts": selected_analysts,
                 },
             },
         )
@@ -103,7 +109,14 @@ def run_hedge_fund(
 
 
 def start(state: AgentState):
-    """Initialize the workflow with the input message."""
+    """Initialize the workflow with the input message and the market data snapshot every agent reads from."""
+    data = state["data"]
+    if "snapshot" not in data:
+        # Load the data the selected analysts read once for the run, with their line items batched per period
+        selected_analysts = state["metadata"].get("selected_analysts")
+        line_item_searches = plan_line_item_searches(selected_analysts)
+        datasets = plan_snapshot_datasets(selected_analysts)
+        data["snapshot"] = MarketSnapshot.build(data["tickers"], data["start_date"], data["end_date"], line_item_searches, datasets)
     return state
 
 
@@ -165,9 +178,29 @@ if __name__ == "__main__":
     parser.add_argument(
         "--show-agent-graph", action="store_true", help="Show the agent graph"
     )
+    parser.add_argument(
+        "--show-api-metrics", action="store_true", help="Show data API cache hits, request counts and latencies at the end of the run"
+    )
+    parser.add_argument(
+        "--llm-cache-path",
+        type=str,
+        default=os.getenv("LLM_CACHE_PATH"),
+        help="Directory used to keep LLM responses between runs. Defaults to LLM_CACHE_PATH (in-memory only if unset)",
+    )
+    parser.add_argument("--no-llm-cache", action="store_true", help="Always query the LLM, even for a prompt it has already answered")
+    parser.add_argument(
+        "--cache-path",
+        type=str,
+        default=os.getenv("DATA_CACHE_PATH"),
+        help="SQLite file used to persist fetched market data between runs. Defaults to DATA_CACHE_PATH (in-memory only if unset)",
+    )
 
     args = parser.parse_args()
 
+    # Persist fetched market data and LLM responses across runs if requested
+    configure_cache(args.cache_path)
+    configure_llm_cache(args.llm_cache_path, enabled=not args.no_llm_cache)
+
     # Parse tickers from comma-separated string
     tickers = [ticker.strip() for ticker in args.tickers.split(",")]
 
@@ -286,3 +319,5 @@ if __name__ == "__main__":
         model_provider=model_provider,
     )
     print_trading_output(result)
+    if args.show_api_metrics:
+        print_api_metrics(get_api_metrics().snapshot())
@@ -1,8 +1,12 @@
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
 import pandas as pd
-import requests
 
-from data.cache import get_cache
+from data.cache import get_cache, prices_frame
+from tools.client import coalesce, get_client
+from tools.metrics import get_api_metrics, instrumented
 from data.models import (
     CompanyNews,
     CompanyNewsResponse,
@@ -16,41 +20,84 @@ from data.models import (
     InsiderTradeResponse,
 )
 
-# Global cache instance
+# Global cache, HTTP client and metrics instances
 _cache = get_cache()
+_client = get_client()
+_metrics = get_api_metrics()
 
 
+@instrumented
 def get_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
-    """Fetch price data from cache or API."""
-    # Check cache first
-    if cached_data := _cache.get_prices(ticker):
-        # Filter cached data by date range and convert to Price objects
-        filtered_data = [Price(**price) for price in cached_data if start_date <= price["time"] <= end_date]
-        if filtered_data:
-            return filtered_data
+    """Fetch price data from cache or API, requesting only the date ranges the cache does not cover yet."""
+    _metrics.record_outcome("get_prices", _fill_prices(ticker, start_date, end_date))
+    return _cache.get_prices(ticker, start_date, end_date)
+
 
-    # If not in cache or no data in range, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
+def _fill_prices(ticker: str, start_date: str, end_date: str) -> str:
+    """Fetch the parts of a date range the cache does not cover yet, returning the cache outcome."""
+    gaps = _cache.get_missing_ranges("prices", ticker, start_date, end_date)
+    for gap_start, gap_end in gaps:
+        if prices := _fetch_prices(ticker, gap_start, gap_end):
+            _cache.set_prices(ticker, prices)
+        _mark_covered("prices", ticker, gap_start, gap_end)
+    return _range_outcome(gaps, start_date, end_date)
 
+
+def _range_outcome(gaps: list[tuple[str, str]], start_date: str, end_date: str) -> str:
+    """Cache outcome of a date range lookup: nothing missing, everything missing, or something in between."""
+    if not gaps:
+        return "hit"
+    return "miss" if gaps == [(start_date, end_date)] else "partial"
+
+
+@coalesce
+def _fetch_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
+    """Fetch daily prices for a date range from the API."""
     url = f"https://api.financialdatasets.ai/prices/?ticker={ticker}&interval=day&interval_multiplier=1&start_date={start_date}&end_date={end_date}"
-    response = requests.get(url, headers=headers)
+    response = _client.get(url)
     if response.status_code != 200:
         raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
 
     # Parse response with Pydantic model
     price_response = PriceResponse(**response.json())
-    prices = price_response.prices
+    return price_response.prices
 
-    if not prices:
-        return []
 
-    # Cache the results as dicts
-    _cache.set_prices(ticker, [p.model_dump() for p in prices])
-    return prices
+def _mark_covered(dataset: str, ticker: str, start_date: str, end_date: str):
+    """Record a fetched range as complete, leaving out today since its data may still change."""
+    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    _cache.add_coverage(dataset, ticker, start_date, min(end_date, yesterday))
+
 
+def _refresh_since_high_water_mark(dataset: str, fetch, store, ticker: str, end_date: str, limit: int) -> str | None:
+    """
+    Fetch only (high-water mark, end_date] for a dataset, so a daily run costs one day of data.
 
+    Returns the cache outcome, or None when nothing has been fetched for the ticker yet and there is no mark to refresh from.
+    """
+    high_water_mark = _cache.get_high_water_mark(dataset, ticker, end_date)
+    if high_water_mark is None:
+        return None
+
+    if high_water_mark >= end_date:
+        return "hit"
+    refresh_start = (datetime.strptime(high_water_mark, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    if records := _fetch_sharded(fetch, ticker, refresh_start, end_date, limit):
+        store(ticker, records)
+    _mark_covered(dataset, ticker, refresh_start, end_date)
+    return "partial"
+
+
+def _mark_page_covered(dataset: str, ticker: str, dates: list[str], end_date: str, limit: int):
+    """Record the range a newest-first page proves complete: all of it if the page was not full, otherwise the days after its oldest one."""
+    oldest = min(date[:10] for date in dates)
+    if len(dates) >= limit:
+        # More records may share the oldest day than fit on the page
+        oldest = (datetime.strptime(oldest, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    _mark_covered(dataset, ticker, oldest, end_date)
+
+
+@instrumented
 def get_financial_metrics(
     ticker: str,
     end_date: str,
@@ -58,37 +105,47 @@ def get_financial_metrics(
     limit: int = 10,
 ) -> list[FinancialMetrics]:
     """Fetch financial metrics from cache or API."""
+    financial_metrics, outcome = _load_financial_metrics(ticker, end_date, period, limit)
+    _metrics.record_outcome("get_financial_metrics", outcome)
+    return financial_metrics
+
+
+def _load_financial_metrics(ticker: str, end_date: str, period: str, limit: int) -> tuple[list[FinancialMetrics], str]:
+    """Financial metrics from cache or API, with the cache outcome for the caller to record."""
     # Check cache first
     if cached_data := _cache.get_financial_metrics(ticker):
-        # Filter cached data by date and limit
-        filtered_data = [FinancialMetrics(**metric) for metric in cached_data if metric["report_period"] <= end_date]
+        # Filter cached data by period, date and limit
+        filtered_data = [metric for metric in cached_data if metric.period == period and metric.report_period <= end_date]
         filtered_data.sort(key=lambda x: x.report_period, reverse=True)
         if filtered_data:
-            return filtered_data[:limit]
+            return filtered_data[:limit], "hit"
 
     # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
+    financial_metrics = _fetch_financial_metrics(ticker, end_date, period, limit)
 
+    if not financial_metrics:
+        return [], "miss"
+
+    # Cache the validated models themselves
+    _cache.set_financial_metrics(ticker, financial_metrics)
+    return financial_metrics, "miss"
+
+
+@coalesce
+def _fetch_financial_metrics(ticker: str, end_date: str, period: str, limit: int) -> list[FinancialMetrics]:
+    """Fetch financial metrics from the API."""
     url = f"https://api.financialdatasets.ai/financial-metrics/?ticker={ticker}&report_period_lte={end_date}&limit={limit}&period={period}"
-    response = requests.get(url, headers=headers)
+    response = _client.get(url)
     if response.status_code != 200:
         raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
 
     # Parse response with Pydantic model
     metrics_response = FinancialMetricsResponse(**response.json())
     # Return the FinancialMetrics objects directly instead of converting to dict
-    financial_metrics = metrics_response.financial_metrics
-
-    if not financial_metrics:
-        return []
-
-    # Cache the results as dicts
-    _cache.set_financial_metrics(ticker, [m.model_dump() for m in financial_metrics])
-    return financial_metrics
+    return metrics_response.financial_metrics
 
 
+@instrumented
 def search_line_items(
     ticker: str,
     line_items: list[str],
@@ -96,34 +153,129 @@ def search_line_items(
     period: str = "ttm",
     limit: int = 10,
 ) -> list[LineItem]:
-    """Fetch line items from API."""
-    # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
-
+    """Fetch line items from cache or API, requesting only the fields the cache does not have yet."""
+    results, outcome = _load_line_items(ticker, line_items, end_date, period, limit)
+    _metrics.record_outcome("search_line_items", outcome)
+    return results
+
+
+def _load_line_items(ticker: str, line_items: list[str], end_date: str, period: str, limit: int) -> tuple[list[LineItem], str]:
+    """Line items from cache or API, with the cache outcome for the caller to record."""
+    missing_line_items = _cache.get_missing_line_items(ticker, line_items, end_date, period, limit)
+    outcome = _fields_outcome(missing_line_items, line_items)
+    if missing_line_items:
+        search_results = _fetch_line_items([ticker], missing_line_items, end_date, period, limit)[:limit]
+        # Cache the results
+        _cache.set_line_items(ticker, missing_line_items, end_date, period, limit, [item.model_dump() for item in search_results])
+
+    cached_data = _cache.get_line_items(ticker, line_items, end_date, period, limit)
+    if cached_data is None:
+        # The fetched fields did not line up with the cached report periods, so search for all of them at once
+        search_results = _fetch_line_items([ticker], line_items, end_date, period, limit)[:limit]
+        _cache.set_line_items(ticker, line_items, end_date, period, limit, [item.model_dump() for item in search_results])
+        return search_results, outcome
+
+    # Cached fields were validated when fetched
+    return [LineItem.model_construct(**item) for item in cached_data], outcome
+
+
+def _fields_outcome(missing_line_items: list[str], line_items: list[str]) -> str:
+    """Cache outcome of a line item lookup: no fields missing, all of them missing, or some."""
+    if not missing_line_items:
+        return "hit"
+    return "miss" if len(missing_line_items) == len(line_items) else "partial"
+
+
+@instrumented
+def search_line_items_bulk(
+    tickers: list[str],
+    line_items: list[str],
+    end_date: str,
+    period: str = "ttm",
+    limit: int = 10,
+    batch_size: int = 20,
+) -> dict[str, list[LineItem]]:
+    """Search line items for many tickers, fetching everything the cache is missing in one request per batch of tickers."""
+    missing = {ticker: _cache.get_missing_line_items(ticker, line_items, end_date, period, limit) for ticker in tickers}
+    for ticker in tickers:
+        _metrics.record_outcome("search_line_items_bulk", _fields_outcome(missing[ticker], line_items))
+    tickers_to_fetch = [ticker for ticker in tickers if missing[ticker]]
+    # Ask for the union of missing fields so each batch is a single request
+    fields = [item for item in line_items if any(item in missing[ticker] for ticker in tickers_to_fetch)]
+
+    for i in range(0, len(tickers_to_fetch), batch_size):
+        batch = tickers_to_fetch[i : i + batch_size]
+        batch_results = _fetch_line_items(batch, fields, end_date, period, limit)
+        if len(batch) > 1 and len(batch_results) == limit:
+            # More rows than `limit` proves it applies per ticker, and fewer means nothing was cut. Exactly `limit`
+            # rows may be a total cap cutting the batch short, and caching that would record short searches as
+            # complete, so leave these tickers to the single-ticker searches below.
+            continue
+        results_by_ticker = {ticker.upper(): [] for ticker in batch}
+        for item in batch_results:
+            results_by_ticker.setdefault(item.ticker.upper(), []).append(item)
+        for ticker in batch:
+            # Keep each ticker's newest periods first, as a single-ticker search returns them
+            results = sorted(results_by_ticker[ticker.upper()], key=lambda item: item.report_period, reverse=True)[:limit]
+            _cache.set_line_items(ticker, fields, end_date, period, limit, [item.model_dump() for item in results])
+
+    # The outcomes were recorded above, so these reads are not counted again under search_line_items
+    return {ticker: _load_line_items(ticker, line_items, end_date, period, limit)[0] for ticker in tickers}
+
+
+@coalesce
+def _fetch_line_items(tickers: list[str], line_items: list[str], end_date: str, period: str, limit: int) -> list[LineItem]:
+    """Search line items for one or more tickers from the API."""
     url = "https://api.financialdatasets.ai/financials/search/line-items"
 
     body = {
-        "tickers": [ticker],
+        "tickers": tickers,
         "line_items": line_items,
         "end_date": end_date,
         "period": period,
         "limit": limit,
     }
-    response = requests.post(url, headers=headers, json=body)
+    response = _client.post(url, json=body)
     if response.status_code != 200:
-        raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
+        raise Exception(f"Error fetching data: {', '.join(tickers)} - {response.status_code} - {response.text}")
     data = response.json()
     response_model = LineItemResponse(**data)
-    search_results = response_model.search_results
-    if not search_results:
-        return []
-
-    # Cache the results
-    return search_results[:limit]
-
-
+    return response_model.search_results
+
+
+def _shard_range(start_date: str, end_date: str, shard_days: int) -> list[tuple[str, str]]:
+    """Split an inclusive date range into consecutive, non-overlapping shards of at most shard_days days."""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    shards = []
+    while start <= end:
+        shard_end = min(start + timedelta(days=shard_days - 1), end)
+        shards.append((start.strftime("%Y-%m-%d"), shard_end.strftime("%Y-%m-%d")))
+        start = shard_end + timedelta(days=1)
+    return shards
+
+
+def _fetch_sharded(fetch, ticker: str, start_date: str, end_date: str, limit: int) -> list:
+    """
+    Fetch a date range as concurrent date shards instead of one long chain of pages.
+
+    Each shard still paginates on its own, so latency is bounded by the slowest shard. Shard
+    size comes from FINANCIAL_DATASETS_SHARD_DAYS (default 90; 0 fetches the range in one go).
+    Records on shard boundaries are deduplicated when they are merged into the cache.
+    """
+    shard_days = int(os.environ.get("FINANCIAL_DATASETS_SHARD_DAYS", 90))
+    shards = _shard_range(start_date, end_date, shard_days) if shard_days > 0 else [(start_date, end_date)]
+    if len(shards) == 1:
+        return fetch(ticker, end_date, start_date, limit)
+
+    max_concurrency = int(os.environ.get("FINANCIAL_DATASETS_MAX_CONCURRENCY", 8))
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(shards))) as executor:
+        # Newest shard first, matching the order a single paginated fetch returns
+        futures = [executor.submit(fetch, ticker, shard_end, shard_start, limit) for shard_start, shard_end in reversed(shards)]
+        return [record for future in futures for record in future.result()]
+
+
+@instrumented
 def get_insider_trades(
     ticker: str,
     end_date: str,
@@ -131,21 +283,52 @@ def get_insider_trades(
     limit: int = 1000,
 ) -> list[InsiderTrade]:
     """Fetch insider trades from cache or API."""
+    if start_date:
+        # With a bounded range, only fetch the parts of it the cache does not cover yet
+        gaps = _cache.get_missing_ranges("insider_trades", ticker, start_date, end_date)
+        for gap_start, gap_end in gaps:
+            if trades := _fetch_sharded(_fetch_insider_trades, ticker, gap_start, gap_end, limit):
+                _cache.set_insider_trades(ticker, trades)
+            _mark_covered("insider_trades", ticker, gap_start, gap_end)
+        _metrics.record_outcome("get_insider_trades", _range_outcome(gaps, start_date, end_date))
+        return _filter_insider_trades(_cache.get_insider_trades(ticker, count=False) or [], start_date, end_date)
+
+    # Without a start date, top up what is cached with only what is newer than its high-water mark
+    if outcome := _refresh_since_high_water_mark("insider_trades", _fetch_insider_trades, _cache.set_insider_trades, ticker, end_date, limit):
+        if filtered_data := _filter_insider_trades(_cache.get_insider_trades(ticker) or [], start_date, end_date):
+            _metrics.record_outcome("get_insider_trades", outcome)
+            return filtered_data
+
     # Check cache first
     if cached_data := _cache.get_insider_trades(ticker):
-        # Filter cached data by date range
-        filtered_data = [InsiderTrade(**trade) for trade in cached_data 
-                        if (start_date is None or (trade.get("transaction_date") or trade["filing_date"]) >= start_date)
-                        and (trade.get("transaction_date") or trade["filing_date"]) <= end_date]
-        filtered_data.sort(key=lambda x: x.transaction_date or x.filing_date, reverse=True)
-        if filtered_data:
+        if filtered_data := _filter_insider_trades(cached_data, start_date, end_date):
+            _metrics.record_outcome("get_insider_trades", "hit")
             return filtered_data
 
     # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
+    _metrics.record_outcome("get_insider_trades", "miss")
+    all_trades = _fetch_insider_trades(ticker, end_date, start_date, limit)
+    if not all_trades:
+        return []
+
+    # Cache the results
+    _cache.set_insider_trades(ticker, all_trades)
+    _mark_page_covered("insider_trades", ticker, [record.filing_date for record in all_trades], end_date, limit)
+    return all_trades
 
+
+def _filter_insider_trades(cached_data: list[InsiderTrade], start_date: str | None, end_date: str) -> list[InsiderTrade]:
+    """Filter cached insider trades by date range, newest first."""
+    filtered_data = [trade for trade in cached_data 
+                    if (start_date is None or (trade.transaction_date or trade.filing_date)[:10] >= start_date)
+                    and (trade.transaction_date or trade.filing_date)[:10] <= end_date]
+    filtered_data.sort(key=lambda x: x.transaction_date or x.filing_date, reverse=True)
+    return filtered_data
+
+
+@coalesce
+def _fetch_insider_trades(ticker: str, end_date: str, start_date: str | None, limit: int) -> list[InsiderTrade]:
+    """Fetch insider trades from the API, paginating back to start_date if one is given."""
     all_trades = []
     current_end_date = end_date
     
@@ -155,7 +338,7 @@ def get_insider_trades(
             url += f"&filing_date_gte={start_date}"
         url += f"&limit={limit}"
         
-        response = requests.get(url, headers=headers)
+        response = _client.get(url)
         if response.status_code != 200:
             raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
         
@@ -179,14 +362,10 @@ def get_insider_trades(
         if current_end_date <= start_date:
             break
 
-    if not all_trades:
-        return []
-
-    # Cache the results
-    _cache.set_insider_trades(ticker, [trade.model_dump() for trade in all_trades])
     return all_trades
 
 
+@instrumented
 def get_company_news(
     ticker: str,
     end_date: str,
@@ -194,21 +373,52 @@ def get_company_news(
     limit: int = 1000,
 ) -> list[CompanyNews]:
     """Fetch company news from cache or API."""
+    if start_date:
+        # With a bounded range, only fetch the parts of it the cache does not cover yet
+        gaps = _cache.get_missing_ranges("company_news", ticker, start_date, end_date)
+        for gap_start, gap_end in gaps:
+            if news := _fetch_sharded(_fetch_company_news, ticker, gap_start, gap_end, limit):
+                _cache.set_company_news(ticker, news)
+            _mark_covered("company_news", ticker, gap_start, gap_end)
+        _metrics.record_outcome("get_company_news", _range_outcome(gaps, start_date, end_date))
+        return _filter_company_news(_cache.get_company_news(ticker, count=False) or [], start_date, end_date)
+
+    # Without a start date, top up what is cached with only what is newer than its high-water mark
+    if outcome := _refresh_since_high_water_mark("company_news", _fetch_company_news, _cache.set_company_news, ticker, end_date, limit):
+        if filtered_data := _filter_company_news(_cache.get_company_news(ticker) or [], start_date, end_date):
+            _metrics.record_outcome("get_company_news", outcome)
+            return filtered_data
+
     # Check cache first
     if cached_data := _cache.get_company_news(ticker):
-        # Filter cached data by date range
-        filtered_data = [CompanyNews(**news) for news in cached_data 
-                        if (start_date is None or news["date"] >= start_date)
-                        and news["date"] <= end_date]
-        filtered_data.sort(key=lambda x: x.date, reverse=True)
-        if filtered_data:
+        if filtered_data := _filter_company_news(cached_data, start_date, end_date):
+            _metrics.record_outcome("get_company_news", "hit")
             return filtered_data
 
     # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
+    _metrics.record_outcome("get_company_news", "miss")
+    all_news = _fetch_company_news(ticker, end_date, start_date, limit)
+    if not all_news:
+        return []
+
+    # Cache the results
+    _cache.set_company_news(ticker, all_news)
+    _mark_page_covered("company_news", ticker, [record.date for record in all_news], end_date, limit)
+    return all_news
+
+
+def _filter_company_news(cached_data: list[CompanyNews], start_date: str | None, end_date: str) -> list[CompanyNews]:
+    """Filter cached company news by date range, newest first."""
+    filtered_data = [news for news in cached_data 
+                    if (start_date is None or news.date[:10] >= start_date)
+                    and news.date[:10] <= end_date]
+    filtered_data.sort(key=lambda x: x.date, reverse=True)
+    return filtered_data
+
 
+@coalesce
+def _fetch_company_news(ticker: str, end_date: str, start_date: str | None, limit: int) -> list[CompanyNews]:
+    """Fetch company news from the API, paginating back to start_date if one is given."""
     all_news = []
     current_end_date = end_date
     
@@ -218,7 +428,7 @@ def get_company_news(
             url += f"&start_date={start_date}"
         url += f"&limit={limit}"
         
-        response = requests.get(url, headers=headers)
+        response = _client.get(url)
         if response.status_code != 200:
             raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
         
@@ -242,41 +452,87 @@ def get_company_news(
         if current_end_date <= start_date:
             break
 
-    if not all_news:
-        return []
-
-    # Cache the results
-    _cache.set_company_news(ticker, [news.model_dump() for news in all_news])
     return all_news
 
 
 
+@instrumented
 def get_market_cap(
     ticker: str,
     end_date: str,
 ) -> float | None:
-    """Fetch market cap from the API."""
-    financial_metrics = get_financial_metrics(ticker, end_date)
-    market_cap = financial_metrics[0].market_cap
+    """Fetch market cap from the cache's point-in-time index, or from the API."""
+    cached = _cache.get_market_cap(ticker, end_date)
+    _metrics.record_outcome("get_market_cap", "miss" if cached is None else "hit")
+    if cached is None:
+        # Fetching financial metrics fills the index; this lookup's outcome is already recorded above
+        _load_financial_metrics(ticker, end_date, "ttm", 10)
+        if (cached := _cache.get_market_cap(ticker, end_date)) is None:
+            return None
+
+    _, market_cap = cached
     if not market_cap:
         return None
 
     return market_cap
 
 
+# Datasets prefetch_universe can warm, mapped to the fetcher that fills the cache for one ticker
+PREFETCH_FETCHERS = {
+    "prices": lambda ticker, start_date, end_date: get_prices(ticker, start_date, end_date),
+    "financial_metrics": lambda ticker, start_date, end_date: get_financial_metrics(ticker, end_date, limit=10),
+    "insider_trades": lambda ticker, start_date, end_date: get_insider_trades(ticker, end_date, start_date=start_date, limit=1000),
+    "company_news": lambda ticker, start_date, end_date: get_company_news(ticker, end_date, start_date=start_date, limit=1000),
+}
+
+
+@instrumented
+def prefetch_universe(
+    tickers: list[str],
+    datasets: list[str],
+    start_date: str,
+    end_date: str,
+    max_concurrency: int | None = None,
+    start_dates: dict[str, str] | None = None,
+):
+    """
+    Warm the cache for every ticker x dataset pair, running the requests concurrently.
+
+    Args:
+        tickers: Tickers to fetch
+        datasets: Names from PREFETCH_FETCHERS to fetch for each ticker
+        start_date: Start of the date range (YYYY-MM-DD)
+        end_date: End of the date range (YYYY-MM-DD)
+        max_concurrency: Maximum requests in flight (default: FINANCIAL_DATASETS_MAX_CONCURRENCY or 8)
+        start_dates: Optional per-dataset overrides of start_date
+    """
+    max_concurrency = max_concurrency or int(os.environ.get("FINANCIAL_DATASETS_MAX_CONCURRENCY", 8))
+    start_dates = start_dates or {}
+    errors = []
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = {
+            executor.submit(PREFETCH_FETCHERS[dataset], ticker, start_dates.get(dataset, start_date), end_date): (ticker, dataset)
+            for ticker in tickers
+            for dataset in datasets
+        }
+        for future in as_completed(futures):
+            if error := future.exception():
+                ticker, dataset = futures[future]
+                errors.append((ticker, dataset, error))
+
+    if errors:
+        # Every request has finished by now, so whatever did succeed is cached
+        ticker, dataset, error = errors[0]
+        raise Exception(f"Error prefetching {dataset} for {ticker} ({len(errors)} of {len(futures)} requests failed)") from error
+
+
 def prices_to_df(prices: list[Price]) -> pd.DataFrame:
     """Convert prices to a DataFrame."""
-    df = pd.DataFrame([p.model_dump() for p in prices])
-    df["Date"] = pd.to_datetime(df["time"])
-    df.set_index("Date", inplace=True)
-    numeric_cols = ["open", "close", "high", "low", "volume"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    df.sort_index(inplace=True)
-    return df
+    return prices_frame(prices)
 
 
-# Update the get_price_data function to use the new functions
+@instrumented
 def get_price_data(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
-    prices = get_prices(ticker, start_date, end_date)
-    return prices_to_df(prices)
+    """Get prices as a DataFrame, sliced from the ticker's cached frame rather than rebuilt on every call."""
+    _metrics.record_outcome("get_price_data", _fill_prices(ticker, start_date, end_date))
+    return _cache.get_prices_df(ticker, start_date, end_date)
@@ -0,0 +1,334 @@
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tools.metrics import get_api_metrics
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# live: talk to the API; record: talk to the API and save every response; replay: serve saved responses, no network
+CLIENT_MODES = ("live", "record", "replay")
+DEFAULT_FIXTURES_DIR = os.path.join(".fixtures", "financialdatasets")
+
+# Requests per minute allowed by each financialdatasets.ai plan tier (None: no client-side limit).
+# Override with FINANCIAL_DATASETS_RATE_LIMIT if your quota differs.
+PLAN_RATE_LIMITS = {
+    "free": 60,
+    "developer": 300,
+    "pro": 1000,
+    "enterprise": None,
+}
+
+
+class RateLimiter:
+    """Token bucket shared by every request the client sends, with metrics on time spent throttled."""
+
+    def __init__(self, requests_per_minute: float | None = None, burst: int | None = None):
+        self.rate = requests_per_minute / 60 if requests_per_minute else None
+        # Allow a second's worth of requests at once by default
+        self.burst = burst or (max(1, int(self.rate)) if self.rate else None)
+        self._tokens = float(self.burst or 0)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._throttled_requests = 0
+        self._throttled_seconds = 0.0
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available. Returns the time spent waiting in seconds."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._paused_until - now, 0.0)
+            if self.rate:
+                self._refill(now)
+                # Reserve the token now so concurrent callers queue up behind each other
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self.rate)
+            self._requests += 1
+            if wait > 0:
+                self._throttled_requests += 1
+                self._throttled_seconds += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        """Hold back every caller for the given time, e.g. after the server answered 429."""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            if self.rate:
+                self._refill(now)
+                self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def stats(self) -> dict:
+        """Requests seen, how many had to wait, and the time they spent waiting (summed over threads)."""
+        with self._lock:
+            return {
+                "requests_per_minute": self.rate * 60 if self.rate else None,
+                "burst": self.burst,
+                "requests": self._requests,
+                "throttled_requests": self._throttled_requests,
+                "throttled_seconds": round(self._throttled_seconds, 3),
+            }
+
+
+class APIClient:
+    """Shared HTTP client for financialdatasets.ai with pooled keep-alive connections, retries and timeouts."""
+
+    def __init__(
+        self,
+        pool_size: int = 20,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        retry_after_max: float = 300.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+    ):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # The server knows when its quota resets, so its Retry-After is honoured beyond backoff_max, up to this guard
+        self.retry_after_max = retry_after_max
+        self.timeout = (connect_timeout, read_timeout)
+        self._mode: str | None = None
+        self._fixtures_dir: str | None = None
+        self._session: requests.Session | None = None
+        self._rate_limiter: RateLimiter | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def mode(self) -> str:
+        """One of CLIENT_MODES; defaults to FINANCIAL_DATASETS_MODE, read on use so .env has been loaded."""
+        mode = self._mode or os.environ.get("FINANCIAL_DATASETS_MODE", "live")
+        if mode not in CLIENT_MODES:
+            raise ValueError(f"Unknown API client mode: {mode}. Expected one of {', '.join(CLIENT_MODES)}")
+        return mode
+
+    @property
+    def fixtures_dir(self) -> str:
+        """Where recorded responses are written to and replayed from; defaults to FINANCIAL_DATASETS_FIXTURES."""
+        return self._fixtures_dir or os.environ.get("FINANCIAL_DATASETS_FIXTURES", DEFAULT_FIXTURES_DIR)
+
+    def set_mode(self, mode: str | None, fixtures_dir: str | None = None):
+        """Switch between live, record and replay modes (None falls back to the environment)."""
+        if mode is not None and mode not in CLIENT_MODES:
+            raise ValueError(f"Unknown API client mode: {mode}. Expected one of {', '.join(CLIENT_MODES)}")
+        self._mode = mode
+        self._fixtures_dir = fixtures_dir
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """
+        The limiter shared by all endpoints, created on first use from the environment:
+        FINANCIAL_DATASETS_RATE_LIMIT (requests per minute) or else FINANCIAL_DATASETS_PLAN (a PLAN_RATE_LIMITS tier).
+        Without either, requests are not limited but 429 responses still pause every caller.
+        """
+        if self._rate_limiter is None:
+            with self._lock:
+                if self._rate_limiter is None:
+                    if rate_limit := os.environ.get("FINANCIAL_DATASETS_RATE_LIMIT"):
+                        requests_per_minute = float(rate_limit)
+                    else:
+                        plan = os.environ.get("FINANCIAL_DATASETS_PLAN", "enterprise").lower()
+                        if plan not in PLAN_RATE_LIMITS:
+                            raise ValueError(f"Unknown financialdatasets.ai plan: {plan}. Expected one of {', '.join(PLAN_RATE_LIMITS)}")
+                        requests_per_minute = PLAN_RATE_LIMITS[plan]
+                    self._rate_limiter = RateLimiter(requests_per_minute)
+        return self._rate_limiter
+
+    def set_rate_limit(self, requests_per_minute: float | None, burst: int | None = None):
+        """Replace the shared limiter (None disables client-side limiting)."""
+        with self._lock:
+            self._rate_limiter = RateLimiter(requests_per_minute, burst)
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled session, created on first use so the API key is read after .env has been loaded."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
+                        session.headers["X-API-KEY"] = api_key
+                    self._session = session
+        return self._session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, or replay its recorded response in replay mode."""
+        mode = self.mode
+        if mode == "replay":
+            return self._replay(method, url, kwargs.get("json"))
+
+        response = self._send(method, url, **kwargs)
+        if mode == "record":
+            self._record(method, url, kwargs.get("json"), response)
+        return response
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying connection errors and retryable status codes with jittered exponential backoff."""
+        kwargs.setdefault("timeout", self.timeout)
+        metrics = get_api_metrics()
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                metrics.record_retry(url)
+            if waited := self.rate_limiter.acquire():
+                metrics.record_throttle(url, waited)
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            metrics.record_response(url, response.status_code, time.perf_counter() - start, len(response.content))
+
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                return response
+            delay = self._retry_after(response) or self._backoff(attempt)
+            if response.status_code == 429:
+                # We are over quota, so back off every thread rather than just this one
+                self.rate_limiter.pause(delay)
+            else:
+                time.sleep(delay)
+        return response
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for the given attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _retry_after(self, response: requests.Response) -> float | None:
+        """Delay requested by the server's Retry-After header, in seconds or as an HTTP date."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(max(delay, 0.0), self.retry_after_max)
+
+    def _fixture_path(self, method: str, url: str, body: dict | None) -> str:
+        """Fixture file for a request, named by a hash of everything that identifies it (the API key excluded)."""
+        key = json.dumps({"method": method, "url": url, "body": body}, sort_keys=True)
+        return os.path.join(self.fixtures_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _record(self, method: str, url: str, body: dict | None, response: requests.Response):
+        path = self._fixture_path(method, url, body)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fixture = {"method": method, "url": url, "body": body, "status_code": response.status_code, "text": response.text}
+        # Write then rename so concurrent fetchers never leave a half-written fixture behind
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+
+    def _replay(self, method: str, url: str, body: dict | None) -> requests.Response:
+        path = self._fixture_path(method, url, body)
+        try:
+            with open(path, encoding="utf-8") as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            raise Exception(f"No recorded response for {method} {url} in {self.fixtures_dir}. Run once with FINANCIAL_DATASETS_MODE=record to capture it.") from None
+
+        response = requests.Response()
+        response.status_code = fixture["status_code"]
+        response._content = fixture["text"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution whose result every caller shares."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+
+    def do(self, key: str, fn, *args, **kwargs):
+        """Run fn unless a call with the same key is already in flight, in which case wait for its result."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+_single_flight = SingleFlight()
+
+
+def coalesce(fn):
+    """Decorator that shares one in-flight call among concurrent callers passing the same arguments."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = f"{fn.__module__}.{fn.__qualname__}:{args!r}:{sorted(kwargs.items())!r}"
+        result = _single_flight.do(key, fn, *args, **kwargs)
+        # Hand each caller its own list so one cannot reorder another's results
+        return list(result) if isinstance(result, list) else result
+
+    return wrapper
+
+
+# Global client instance
+_client = APIClient()
+
+
+def get_client() -> APIClient:
+    """Get the global API client instance."""
+    return _client
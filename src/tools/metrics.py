@@ -0,0 +1,109 @@
+import functools
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlparse
+
+# Cache outcomes a tools.api call can record: everything cached, nothing cached, or only some of it
+CACHE_OUTCOMES = ("hit", "miss", "partial")
+
+
+class APIMetrics:
+    """Counters and latency samples for tools.api calls and the HTTP requests behind them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._calls: dict[str, list[float]] = defaultdict(list)
+            self._outcomes: dict[str, Counter] = defaultdict(Counter)
+            self._requests: dict[str, list[float]] = defaultdict(list)
+            self._status_codes: dict[str, Counter] = defaultdict(Counter)
+            self._bytes: Counter = Counter()
+            self._retries: Counter = Counter()
+            self._throttled: Counter = Counter()
+
+    def record_call(self, function: str, seconds: float):
+        with self._lock:
+            self._calls[function].append(seconds)
+
+    def record_outcome(self, function: str, outcome: str):
+        """Record whether a call was served from the cache (hit), from the API (miss) or from both (partial)."""
+        with self._lock:
+            self._outcomes[function][outcome] += 1
+
+    def record_response(self, url: str, status_code: int, seconds: float, size: int):
+        """Record one HTTP attempt against the endpoint (URL path) it was sent to."""
+        endpoint = urlparse(url).path
+        with self._lock:
+            self._requests[endpoint].append(seconds)
+            self._status_codes[endpoint][status_code] += 1
+            self._bytes[endpoint] += size
+
+    def record_retry(self, url: str):
+        with self._lock:
+            self._retries[urlparse(url).path] += 1
+
+    def record_throttle(self, url: str, seconds: float):
+        """Record time a request spent waiting on the client-side rate limiter."""
+        with self._lock:
+            self._throttled[urlparse(url).path] += seconds
+
+    def snapshot(self) -> dict:
+        """Current counters and p50/p95/p99 latencies (seconds), per tools.api function and per endpoint."""
+        with self._lock:
+            functions = {
+                function: {
+                    "calls": len(samples),
+                    **{f"cache_{outcome}": self._outcomes[function][outcome] for outcome in CACHE_OUTCOMES},
+                    "total_seconds": sum(samples),
+                    **_percentiles(samples),
+                }
+                for function, samples in self._calls.items()
+            }
+            endpoints = {
+                endpoint: {
+                    "requests": len(samples),
+                    "retries": self._retries[endpoint],
+                    "bytes": self._bytes[endpoint],
+                    "status_codes": dict(self._status_codes[endpoint]),
+                    "throttled_seconds": self._throttled[endpoint],
+                    "total_seconds": sum(samples),
+                    **_percentiles(samples),
+                }
+                for endpoint, samples in self._requests.items()
+            }
+        return {"functions": functions, "endpoints": endpoints}
+
+
+def _percentiles(samples: list[float]) -> dict:
+    """Nearest-rank p50, p95 and p99 of a list of latencies."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": None, "p95": None, "p99": None}
+    return {f"p{q}": ordered[min(len(ordered) - 1, max(0, -(-q * len(ordered) // 100) - 1))] for q in (50, 95, 99)}
+
+
+def instrumented(fn):
+    """Decorator that records the latency of every call to a tools.api function."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _metrics.record_call(fn.__name__, time.perf_counter() - start)
+
+    return wrapper
+
+
+# Global metrics instance
+_metrics = APIMetrics()
+
+
+def get_api_metrics() -> APIMetrics:
+    """Get the global API metrics instance."""
+    return _metrics
@@ -1,16 +1,16 @@
 """Constants and utilities related to analysts configuration."""
 
-from agents.ben_graham import ben_graham_agent
-from agents.bill_ackman import bill_ackman_agent
-from agents.cathie_wood import cathie_wood_agent
-from agents.charlie_munger import charlie_munger_agent
+from agents.ben_graham import ben_graham_agent, GRAHAM_LINE_ITEM_SEARCH
+from agents.bill_ackman import bill_ackman_agent, ACKMAN_LINE_ITEM_SEARCH
+from agents.cathie_wood import cathie_wood_agent, WOOD_LINE_ITEM_SEARCH
+from agents.charlie_munger import charlie_munger_agent, MUNGER_LINE_ITEM_SEARCH
 from agents.fundamentals import fundamentals_agent
-from agents.phil_fisher import phil_fisher_agent
+from agents.phil_fisher import phil_fisher_agent, FISHER_LINE_ITEM_SEARCH
 from agents.sentiment import sentiment_agent
-from agents.stanley_druckenmiller import stanley_druckenmiller_agent
+from agents.stanley_druckenmiller import stanley_druckenmiller_agent, DRUCKENMILLER_LINE_ITEM_SEARCH
 from agents.technicals import technical_analyst_agent
-from agents.valuation import valuation_agent
-from agents.warren_buffett import warren_buffett_agent
+from agents.valuation import valuation_agent, VALUATION_LINE_ITEM_SEARCH
+from agents.warren_buffett import warren_buffett_agent, BUFFETT_LINE_ITEM_SEARCH
 
 # Define analyst configuration - single source of truth
 ANALYST_CONFIG = {
@@ -18,56 +18,75 @@ ANALYST_CONFIG = {
         "display_name": "Ben Graham",
         "agent_func": ben_graham_agent,
         "order": 0,
+        "line_item_search": GRAHAM_LINE_ITEM_SEARCH,
+        "snapshot_datasets": ("financial_metrics_annual", "market_cap"),
     },
     "bill_ackman": {
         "display_name": "Bill Ackman",
         "agent_func": bill_ackman_agent,
         "order": 1,
+        "line_item_search": ACKMAN_LINE_ITEM_SEARCH,
+        "snapshot_datasets": ("financial_metrics_annual", "market_cap"),
     },
     "cathie_wood": {
         "display_name": "Cathie Wood",
         "agent_func": cathie_wood_agent,
         "order": 2,
+        "line_item_search": WOOD_LINE_ITEM_SEARCH,
+        "snapshot_datasets": ("financial_metrics_annual", "market_cap"),
     },
     "charlie_munger": {
         "display_name": "Charlie Munger",
         "agent_func": charlie_munger_agent,
         "order": 3,
+        "line_item_search": MUNGER_LINE_ITEM_SEARCH,
+        "snapshot_datasets": ("financial_metrics_annual", "market_cap", "insider_trades", "company_news"),
     },
     "phil_fisher": {
         "display_name": "Phil Fisher",
         "agent_func": phil_fisher_agent,
         "order": 4,
+        "line_item_search": FISHER_LINE_ITEM_SEARCH,
+        "snapshot_datasets": ("financial_metrics_annual", "market_cap", "insider_trades", "company_news"),
     },
     "stanley_druckenmiller": {
         "display_name": "Stanley Druckenmiller",
         "agent_func": stanley_druckenmiller_agent,
         "order": 5,
+        "line_item_search": DRUCKENMILLER_LINE_ITEM_SEARCH,
+        "snapshot_datasets": ("financial_metrics_annual", "market_cap", "insider_trades", "company_news", "prices"),
     },
     "warren_buffett": {
         "display_name": "Warren Buffett",
         "agent_func": warren_buffett_agent,
         "order": 6,
+        "line_item_search": BUFFETT_LINE_ITEM_SEARCH,
+        "snapshot_datasets": ("financial_metrics_ttm", "market_cap"),
     },
     "technical_analyst": {
         "display_name": "Technical Analyst",
         "agent_func": technical_analyst_agent,
         "order": 7,
+        "snapshot_datasets": ("prices",),
     },
     "fundamentals_analyst": {
         "display_name": "Fundamentals Analyst",
         "agent_func": fundamentals_agent,
         "order": 8,
+        "snapshot_datasets": ("financial_metrics_ttm",),
     },
     "sentiment_analyst": {
         "display_name": "Sentiment Analyst",
         "agent_func": sentiment_agent,
         "order": 9,
+        "snapshot_datasets": ("insider_trades", "company_news"),
     },
     "valuation_analyst": {
         "display_name": "Valuation Analyst",
         "agent_func": valuation_agent,
         "order": 10,
+        "line_item_search": VALUATION_LINE_ITEM_SEARCH,
+        "snapshot_datasets": ("financial_metrics_ttm", "market_cap"),
     },
 }
 
@@ -78,3 +97,30 @@ ANALYST_ORDER = [(config["display_name"], key) for key, config in sorted(ANALYST
 def get_analyst_nodes():
     """Get the mapping of analyst keys to their (node_name, agent_func) tuples."""
     return {key: (f"{key}_agent", config["agent_func"]) for key, config in ANALYST_CONFIG.items()}
+
+
+def plan_snapshot_datasets(selected_analysts: list[str] | None = None) -> list[str]:
+    """
+    The market snapshot datasets the selected analysts (all analysts if none are selected) read, plus the prices
+    the risk manager reads for every run.
+    """
+    datasets = ["prices"]
+    for key in selected_analysts or ANALYST_CONFIG.keys():
+        datasets.extend(dataset for dataset in ANALYST_CONFIG[key]["snapshot_datasets"] if dataset not in datasets)
+    return datasets
+
+
+def plan_line_item_searches(selected_analysts: list[str] | None = None) -> list[dict]:
+    """
+    Merge the line item searches of the selected analysts (all analysts if none are selected) into one search per
+    period, covering the union of their line items at the largest limit any of them asks for. The market snapshot
+    runs each merged search once for all tickers, and every analyst's own search is then answered from the cache.
+    """
+    searches: dict[str, dict] = {}
+    for key in selected_analysts or ANALYST_CONFIG.keys():
+        if not (search := ANALYST_CONFIG[key].get("line_item_search")):
+            continue
+        merged = searches.setdefault(search["period"], {"line_items": [], "period": search["period"], "limit": 0})
+        merged["line_items"].extend(item for item in search["line_items"] if item not in merged["line_items"])
+        merged["limit"] = max(merged["limit"], search["limit"])
+    return list(searches.values())
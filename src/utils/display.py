@@ -364,3 +364,50 @@ def format_backtest_row(
             f"{Fore.RED}{bearish_count}{Style.RESET_ALL}",
             f"{Fore.BLUE}{neutral_count}{Style.RESET_ALL}",
         ]
+
+
+def print_api_metrics(metrics: dict) -> None:
+    """
+    Print tables of data API usage: cache outcomes and latency per tools.api function, and traffic per endpoint.
+
+    Args:
+        metrics (dict): Snapshot from tools.metrics.get_api_metrics().snapshot()
+    """
+
+    def ms(seconds):
+        return f"{seconds * 1000:,.1f}" if seconds is not None else ""
+
+    print(f"\n{Fore.WHITE}{Style.BRIGHT}DATA API CALLS:{Style.RESET_ALL}")
+    function_rows = [
+        [
+            f"{Fore.CYAN}{function}{Style.RESET_ALL}",
+            stats["calls"],
+            f"{Fore.GREEN}{stats['cache_hit']}{Style.RESET_ALL}",
+            f"{Fore.YELLOW}{stats['cache_partial']}{Style.RESET_ALL}",
+            f"{Fore.RED}{stats['cache_miss']}{Style.RESET_ALL}",
+            f"{stats['total_seconds']:,.2f}",
+            ms(stats["p50"]),
+            ms(stats["p95"]),
+            ms(stats["p99"]),
+        ]
+        for function, stats in sorted(metrics["functions"].items())
+    ]
+    print(tabulate(function_rows, headers=["Function", "Calls", "Hits", "Partial", "Misses", "Total (s)", "p50 (ms)", "p95 (ms)", "p99 (ms)"], tablefmt="grid", colalign=("left", "right", "right", "right", "right", "right", "right", "right", "right")))
+
+    print(f"\n{Fore.WHITE}{Style.BRIGHT}DATA API REQUESTS:{Style.RESET_ALL}")
+    endpoint_rows = [
+        [
+            f"{Fore.CYAN}{endpoint}{Style.RESET_ALL}",
+            stats["requests"],
+            stats["retries"],
+            ", ".join(f"{code}: {count}" for code, count in sorted(stats["status_codes"].items())),
+            f"{stats['bytes'] / 1_000_000:,.2f}",
+            f"{stats['throttled_seconds']:,.2f}",
+            f"{stats['total_seconds']:,.2f}",
+            ms(stats["p50"]),
+            ms(stats["p95"]),
+            ms(stats["p99"]),
+        ]
+        for endpoint, stats in sorted(metrics["endpoints"].items())
+    ]
+    print(tabulate(endpoint_rows, headers=["Endpoint", "Requests", "Retries", "Status codes", "MB", "Throttled (s)", "Total (s)", "p50 (ms)", "p95 (ms)", "p99 (ms)"], tablefmt="grid"))
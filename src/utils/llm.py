@@ -1,12 +1,45 @@
 """Helper functions for LLM"""
 
+import asyncio
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import TypeVar, Type, Optional, Any
-from pydantic import BaseModel
+from langchain_core.messages import HumanMessage
+from langchain_core.prompt_values import ChatPromptValue
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, RootModel
 from utils.progress import progress
 
 T = TypeVar('T', bound=BaseModel)
 
+# LLM requests allowed in flight per provider, unless LLM_MAX_CONCURRENCY says otherwise
+DEFAULT_PROVIDER_CONCURRENCY = 4
+
+_provider_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_provider_semaphores_lock = threading.Lock()
+
+
+def _provider_semaphore(model_provider: Any) -> threading.BoundedSemaphore:
+    """
+    Get the semaphore that caps concurrent requests to a provider across all agents and threads.
+    LLM_MAX_CONCURRENCY is either one limit for every provider ("8") or per provider ("OpenAI=8,Anthropic=4").
+    """
+    provider = str(getattr(model_provider, "value", model_provider))
+    with _provider_semaphores_lock:
+        if provider not in _provider_semaphores:
+            limits = {}
+            default = DEFAULT_PROVIDER_CONCURRENCY
+            for item in os.environ.get("LLM_MAX_CONCURRENCY", "").split(","):
+                if "=" in item:
+                    name, limit = item.split("=", 1)
+                    limits[name.strip().lower()] = int(limit)
+                elif item.strip():
+                    default = int(item)
+            _provider_semaphores[provider] = threading.BoundedSemaphore(limits.get(provider.lower(), default))
+        return _provider_semaphores[provider]
+
 def call_llm(
     prompt: Any,
     model_name: str,
@@ -14,7 +47,8 @@ def call_llm(
     pydantic_model: Type[T],
     agent_name: Optional[str] = None,
     max_retries: int = 3,
-    default_factory = None
+    default_factory = None,
+    use_cache: bool = True,
 ) -> T:
     """
     Makes an LLM call with retry logic, handling both Deepseek and non-Deepseek models.
@@ -27,34 +61,40 @@ def call_llm(
         agent_name: Optional name of the agent for progress updates
         max_retries: Maximum number of retries (default: 3)
         default_factory: Optional factory function to create default response on failure
+        use_cache: Reuse the response to an identical earlier prompt from the LLM response cache (default: True)
         
     Returns:
         An instance of the specified Pydantic model
     """
-    from llm.models import get_model, get_model_info
-    
+    from llm.cache import get_llm_cache
+    from llm.models import get_model_info, get_model_registry
+
+    # Identical prompts to the same model with the same output schema get the same cached response
+    cache = get_llm_cache()
+    cache_key = cache.key(model_name, model_provider, prompt, pydantic_model) if use_cache and cache.enabled else None
+    if cache_key and (cached_result := cache.get(cache_key, pydantic_model)) is not None:
+        return cached_result
+
     model_info = get_model_info(model_name)
-    llm = get_model(model_name, model_provider)
-    
-    # For non-JSON support models, we can use structured output
-    if not (model_info and not model_info.has_json_mode()):
-        llm = llm.with_structured_output(
-            pydantic_model,
-            method="json_mode",
-        )
+    # Shared client, already wrapped for structured output on models with JSON mode
+    llm = get_model_registry().get(model_name, model_provider, pydantic_model)
     
     # Call the LLM with retries
     for attempt in range(max_retries):
         try:
-            # Call the LLM
-            result = llm.invoke(prompt)
+            # Call the LLM, waiting for a free slot if the provider already has its limit of requests in flight
+            with _provider_semaphore(model_provider):
+                result = llm.invoke(prompt)
             
             # For non-JSON support models, we need to extract and parse the JSON manually
             if model_info and not model_info.has_json_mode():
                 parsed_result = extract_json_from_deepseek_response(result.content)
-                if parsed_result:
-                    return pydantic_model(**parsed_result)
-            else:
+                result = pydantic_model.model_validate(parsed_result) if parsed_result else None
+
+            if result is not None:
+                # Only successful responses are cached, never the defaults used after failures
+                if cache_key:
+                    cache.set(cache_key, result)
                 return result
                 
         except Exception as e:
@@ -71,6 +111,131 @@ def call_llm(
     # This should never be reached due to the retry logic above
     return create_default_response(pydantic_model)
 
+async def acall_llm(
+    prompt: Any,
+    model_name: str,
+    model_provider: str,
+    pydantic_model: Type[T],
+    agent_name: Optional[str] = None,
+    max_retries: int = 3,
+    default_factory = None,
+    use_cache: bool = True,
+) -> T:
+    """
+    Async version of call_llm. The call runs on a worker thread, so it shares call_llm's response cache,
+    retries and per-provider concurrency limit with synchronous callers.
+    """
+    return await asyncio.to_thread(
+        call_llm,
+        prompt=prompt,
+        model_name=model_name,
+        model_provider=model_provider,
+        pydantic_model=pydantic_model,
+        agent_name=agent_name,
+        max_retries=max_retries,
+        default_factory=default_factory,
+        use_cache=use_cache,
+    )
+
+
+def call_llm_many(requests: list[dict], max_workers: int = 32) -> list:
+    """
+    Make many LLM calls concurrently and return their results in the order of the requests.
+
+    Agents collect the analysis for every ticker first and then ask the LLM about all of them at once, so a run
+    waits for its slowest call rather than for the sum of them.
+
+    Args:
+        requests: Keyword arguments for call_llm, one dict per call
+        max_workers: Maximum calls waiting or in flight at once; the per-provider limit still applies
+
+    Returns:
+        One instance of each request's Pydantic model
+    """
+    if len(requests) <= 1:
+        return [call_llm(**request) for request in requests]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as executor:
+        return list(executor.map(lambda request: call_llm(**request), requests))
+
+
+def call_llm_batched(
+    template: ChatPromptTemplate,
+    analysis_data: dict[str, Any],
+    model_name: str,
+    model_provider: str,
+    pydantic_model: Type[T],
+    agent_name: Optional[str] = None,
+    default_factory = None,
+    batch_size: Optional[int] = None,
+) -> dict[str, T]:
+    """
+    Get one structured response per ticker in analysis_data, asking about up to batch_size tickers in a single prompt.
+
+    Batched prompts share one system prompt and one round trip, and answer with a dict[ticker, pydantic_model].
+    Any ticker a batched response leaves out (or the whole batch, if it cannot be parsed) is asked about again
+    on its own. All prompts are sent concurrently.
+
+    Args:
+        template: Prompt template with "ticker" and "analysis_data" variables
+        analysis_data: Analysis data by ticker, in the order the responses are returned
+        model_name: Name of the model to use
+        model_provider: Provider of the model
+        pydantic_model: The Pydantic model class of one ticker's response
+        agent_name: Optional name of the agent for progress updates
+        default_factory: Optional factory function to create default response on failure
+        batch_size: Tickers per prompt (default: LLM_BATCH_SIZE, or 1, which sends one prompt per ticker)
+
+    Returns:
+        The response for each ticker, in the order of analysis_data
+    """
+    tickers = list(analysis_data)
+
+    def build_prompt(batch: list[str]):
+        return template.invoke({"analysis_data": json.dumps({ticker: analysis_data[ticker] for ticker in batch}, indent=2), "ticker": ", ".join(batch)})
+
+    batch_size = batch_size or int(os.environ.get("LLM_BATCH_SIZE", 1))
+    single = {"model_name": model_name, "model_provider": model_provider, "pydantic_model": pydantic_model, "agent_name": agent_name, "default_factory": default_factory}
+    if batch_size <= 1 or len(tickers) <= 1:
+        return dict(zip(tickers, call_llm_many([{"prompt": build_prompt([ticker]), **single} for ticker in tickers])))
+
+    batch_model = RootModel[dict[str, pydantic_model]]
+    batches = [tickers[i : i + batch_size] for i in range(0, len(tickers), batch_size)]
+    batch_requests = [
+        {
+            "prompt": _with_batch_instructions(build_prompt(batch), batch),
+            "model_name": model_name,
+            "model_provider": model_provider,
+            "pydantic_model": batch_model,
+            "agent_name": agent_name,
+            # One attempt only: a batch that fails is cheaper to retry ticker by ticker
+            "max_retries": 1,
+            "default_factory": lambda: batch_model({}),
+        }
+        for batch in batches
+    ]
+    results = {}
+    for batch, batch_result in zip(batches, call_llm_many(batch_requests)):
+        results.update({ticker: batch_result.root[ticker] for ticker in batch if ticker in batch_result.root})
+
+    if missing := [ticker for ticker in tickers if ticker not in results]:
+        if agent_name:
+            progress.update_status(agent_name, None, f"Retrying {len(missing)} ticker(s) one at a time")
+        results.update(zip(missing, call_llm_many([{"prompt": build_prompt([ticker]), **single} for ticker in missing])))
+    return {ticker: results[ticker] for ticker in tickers}
+
+
+def _with_batch_instructions(prompt: Any, tickers: list[str]) -> Any:
+    """Append the instruction to answer with one JSON object keyed by ticker to a prompt."""
+    instructions = (
+        f"You are analyzing {len(tickers)} tickers at once: {', '.join(tickers)}. "
+        "Apply the instructions above to each ticker separately, using only that ticker's analysis data. "
+        "Return a single JSON object whose keys are exactly these tickers and whose values each follow the JSON format above."
+    )
+    if isinstance(prompt, str):
+        return f"{prompt}\n\n{instructions}"
+    return ChatPromptValue(messages=[*prompt.to_messages(), HumanMessage(content=instructions)])
+
+
 def create_default_response(model_class: Type[T]) -> T:
     """Creates a safe default response based on the model's fields."""
     default_values = {}
@@ -0,0 +1,63 @@
+import pytest
+
+from data.cache import Cache
+from data.models import FinancialMetrics, LineItem
+from tools import api
+from tools.metrics import APIMetrics
+
+
+@pytest.fixture
+def line_item_api(monkeypatch):
+    """A fresh cache and a fake line item search returning `rows_per_ticker` rows per ticker, capped at `total_cap` rows in all."""
+    calls = []
+    settings = {"rows_per_ticker": 5, "total_cap": None}
+
+    def fetch_line_items(tickers, line_items, end_date, period, limit):
+        calls.append(list(tickers))
+        rows = [
+            LineItem(ticker=ticker, report_period=f"2023-{month:02d}-28", period=period, currency="USD", **{item: 1.0 for item in line_items})
+            for ticker in tickers
+            for month in range(12, 12 - min(settings["rows_per_ticker"], limit), -1)
+        ]
+        return rows[: settings["total_cap"]]
+
+    monkeypatch.setattr(api, "_cache", Cache())
+    monkeypatch.setattr(api, "_fetch_line_items", fetch_line_items)
+    return calls, settings
+
+
+def test_bulk_search_answers_every_ticker_from_one_request(line_item_api):
+    calls, _ = line_item_api
+    results = api.search_line_items_bulk(["AAPL", "MSFT", "NVDA"], ["net_income"], "2024-01-01", limit=5)
+
+    assert calls == [["AAPL", "MSFT", "NVDA"]]
+    assert {ticker: len(items) for ticker, items in results.items()} == {"AAPL": 5, "MSFT": 5, "NVDA": 5}
+
+
+def test_bulk_search_falls_back_when_a_batch_may_be_capped_in_total(line_item_api):
+    calls, settings = line_item_api
+    settings["total_cap"] = 5
+    results = api.search_line_items_bulk(["AAPL", "MSFT", "NVDA"], ["net_income"], "2024-01-01", limit=5)
+
+    assert calls == [["AAPL", "MSFT", "NVDA"], ["AAPL"], ["MSFT"], ["NVDA"]]
+    assert {ticker: len(items) for ticker, items in results.items()} == {"AAPL": 5, "MSFT": 5, "NVDA": 5}
+
+
+def test_bulk_search_caches_short_batches(line_item_api):
+    calls, settings = line_item_api
+    settings["rows_per_ticker"] = 1
+    results = api.search_line_items_bulk(["AAPL", "MSFT"], ["net_income"], "2024-01-01", limit=5)
+
+    assert calls == [["AAPL", "MSFT"]]
+    assert {ticker: len(items) for ticker, items in results.items()} == {"AAPL": 1, "MSFT": 1}
+
+
+def test_nested_lookups_are_counted_once(line_item_api, monkeypatch):
+    monkeypatch.setattr(api, "_metrics", APIMetrics())
+    monkeypatch.setattr(api, "_fetch_financial_metrics", lambda ticker, end_date, period, limit: [FinancialMetrics.model_construct(ticker=ticker, report_period="2023-12-31", period=period, market_cap=1.0)])
+
+    api.get_market_cap("AAPL", "2024-01-01")
+    api.search_line_items_bulk(["AAPL", "MSFT"], ["net_income"], "2024-01-01", limit=5)
+
+    outcomes = {function: dict(counts) for function, counts in api._metrics._outcomes.items()}
+    assert outcomes == {"get_market_cap": {"miss": 1}, "search_line_items_bulk": {"miss": 2}}
@@ -0,0 +1,192 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from data import cache as cache_module
+from data.cache import Cache, SQLiteCacheBackend
+from data.models import CompanyNews, FinancialMetrics, InsiderTrade, Price
+
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A clock for the cache module that starts at noon on 2024-02-01 and only moves when advanced."""
+    now = [datetime(2024, 2, 1, 12).timestamp()]
+    clock = SimpleNamespace(time=lambda: now[0], advance=lambda seconds: now.__setitem__(0, now[0] + seconds))
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def make_price(date: str) -> Price:
+    return Price(open=1.0, close=1.0, high=1.0, low=1.0, volume=100, time=f"{date}T00:00:00Z")
+
+
+def make_news(date: str, title: str = "headline") -> CompanyNews:
+    return CompanyNews(ticker="AAPL", title=title, author="author", source="source", date=date, url=f"https://example.com/{title}")
+
+
+def make_trade(name: str, shares: float, filing_date: str = "2024-01-02") -> InsiderTrade:
+    return InsiderTrade.model_construct(ticker="AAPL", name=name, transaction_date="2024-01-01", transaction_shares=shares, transaction_price_per_share=10.0, filing_date=filing_date)
+
+
+def make_metrics(period: str) -> FinancialMetrics:
+    return FinancialMetrics.model_construct(ticker="AAPL", report_period="2024-03-31", period=period, market_cap=1.0)
+
+
+def test_missing_ranges_are_the_gaps_around_coverage():
+    cache = Cache()
+    cache.add_coverage("prices", "AAPL", "2024-01-05", "2024-01-10")
+    cache.add_coverage("prices", "AAPL", "2024-01-20", "2024-01-25")
+
+    assert cache.get_missing_ranges("prices", "AAPL", "2024-01-01", "2024-01-31") == [
+        ("2024-01-01", "2024-01-04"),
+        ("2024-01-11", "2024-01-19"),
+        ("2024-01-26", "2024-01-31"),
+    ]
+    assert cache.get_missing_ranges("prices", "AAPL", "2024-01-06", "2024-01-09") == []
+
+
+def test_adjacent_coverage_intervals_merge():
+    cache = Cache()
+    cache.add_coverage("prices", "AAPL", "2024-01-01", "2024-01-10")
+    cache.add_coverage("prices", "AAPL", "2024-01-11", "2024-01-20")
+
+    assert cache.get_missing_ranges("prices", "AAPL", "2024-01-01", "2024-01-20") == []
+    assert cache.get_high_water_mark("prices", "AAPL", "2024-01-31") == "2024-01-20"
+
+
+def test_range_lookup_counts_miss_before_fill_and_hit_after():
+    cache = Cache()
+    assert cache.get_missing_ranges("prices", "AAPL", "2024-01-01", "2024-01-02") == [("2024-01-01", "2024-01-02")]
+    cache.set_prices("AAPL", [make_price("2024-01-01"), make_price("2024-01-02")])
+    cache.add_coverage("prices", "AAPL", "2024-01-01", "2024-01-02")
+    # Reading the filled range does not count a second time
+    assert len(cache.get_prices("AAPL", "2024-01-01", "2024-01-02")) == 2
+
+    assert cache.get_missing_ranges("prices", "AAPL", "2024-01-01", "2024-01-02") == []
+    stats = cache.stats()["prices"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_record_lookup_counts_hits_and_misses():
+    cache = Cache()
+    assert cache.get_company_news("AAPL") is None
+    cache.set_company_news("AAPL", [make_news("2024-01-01")])
+    assert len(cache.get_company_news("AAPL")) == 1
+
+    stats = cache.stats()["company_news"]
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_merge_deduplicates_within_a_batch():
+    cache = Cache()
+    cache.set_company_news("AAPL", [make_news("2024-01-01"), make_news("2024-01-01"), make_news("2024-01-02")])
+    cache.set_company_news("AAPL", [make_news("2024-01-02")])
+
+    assert [news.date for news in cache.get_company_news("AAPL")] == ["2024-01-01", "2024-01-02"]
+
+
+def test_distinct_records_on_the_same_day_survive_the_merge():
+    cache = Cache()
+    cache.set_insider_trades("AAPL", [make_trade("Alice", 100), make_trade("Bob", 100), make_trade("Alice", -50)])
+    cache.set_company_news("AAPL", [make_news("2024-01-01", "first"), make_news("2024-01-01", "second")])
+    # The same trade fetched again, e.g. by an overlapping shard, is still dropped
+    cache.set_insider_trades("AAPL", [make_trade("Bob", 100)])
+
+    assert len(cache.get_insider_trades("AAPL")) == 3
+    assert len(cache.get_company_news("AAPL")) == 2
+
+
+def test_financial_metrics_of_each_period_are_kept_apart():
+    cache = Cache()
+    cache.set_financial_metrics("AAPL", [make_metrics(period) for period in ("ttm", "annual")])
+
+    assert sorted(metric.period for metric in cache.get_financial_metrics("AAPL")) == ["annual", "ttm"]
+
+
+def test_backend_persists_records_and_coverage(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = Cache(SQLiteCacheBackend(path))
+    cache.set_prices("AAPL", [make_price("2024-01-01")])
+    cache.add_coverage("prices", "AAPL", "2024-01-01", "2024-01-01")
+
+    restarted = Cache(SQLiteCacheBackend(path))
+    assert restarted.get_missing_ranges("prices", "AAPL", "2024-01-01", "2024-01-01") == []
+    assert [price.time for price in restarted.get_prices("AAPL")] == ["2024-01-01T00:00:00Z"]
+
+
+def test_ttl_refetches_only_the_days_that_were_recent_when_fetched(tmp_path, clock):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+    cache = Cache(backend, ttls={"company_news": 10 * DAY})
+    cache.set_company_news("AAPL", [make_news("2023-06-01"), make_news("2024-01-30")])
+    cache.add_coverage("company_news", "AAPL", "2023-01-01", "2024-01-31")
+
+    clock.advance(11 * DAY)
+    assert cache.get_missing_ranges("company_news", "AAPL", "2023-01-01", "2024-01-31") == [("2024-01-22", "2024-01-31")]
+    assert cache.get_high_water_mark("company_news", "AAPL", "2024-01-31") == "2024-01-21"
+    # History is kept, in memory and on disk
+    assert len(cache.get_company_news("AAPL", count=False)) == 2
+    assert len(backend.load("company_news", "AAPL")) == 2
+    assert cache.stats()["company_news"]["expirations"] == 1
+
+    cache.add_coverage("company_news", "AAPL", "2024-01-22", "2024-01-31")
+    assert cache.get_missing_ranges("company_news", "AAPL", "2023-01-01", "2024-01-31") == []
+
+
+def test_ttl_applies_to_data_fetched_before_a_restart(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    cache = Cache(SQLiteCacheBackend(path))
+    cache.set_company_news("AAPL", [make_news("2024-01-30")])
+    cache.add_coverage("company_news", "AAPL", "2024-01-01", "2024-01-31")
+    cache.set_financial_metrics("AAPL", [make_metrics("ttm")])
+
+    clock.advance(11 * DAY)
+    restarted = Cache(SQLiteCacheBackend(path), ttls={"company_news": 10 * DAY, "financial_metrics": 10 * DAY})
+    assert restarted.get_missing_ranges("company_news", "AAPL", "2024-01-01", "2024-01-31") == [("2024-01-22", "2024-01-31")]
+    assert restarted.get_financial_metrics("AAPL") is None
+
+
+def test_expired_financial_metrics_answer_again_once_refetched(tmp_path, clock):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+    cache = Cache(backend, ttls={"financial_metrics": 60})
+    cache.set_financial_metrics("AAPL", [make_metrics("ttm")])
+    assert cache.get_financial_metrics("AAPL") is not None
+
+    clock.advance(120)
+    assert cache.get_financial_metrics("AAPL") is None
+    assert cache.get_market_cap("AAPL", "2024-12-31") is None
+    assert len(backend.load("financial_metrics", "AAPL")) == 1
+
+    # A refetch that brings nothing new still refreshes the data, on disk too
+    cache.set_financial_metrics("AAPL", [make_metrics("ttm")])
+    assert len(cache.get_financial_metrics("AAPL")) == 1
+    assert Cache(SQLiteCacheBackend(str(tmp_path / "cache.db")), ttls={"financial_metrics": 60}).get_financial_metrics("AAPL") is not None
+    stats = cache.stats()["financial_metrics"]
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (2, 2, 2)
+
+
+def test_memory_budget_evicts_least_recently_used_ticker():
+    cache = Cache(memory_budgets={"company_news": 1})
+    cache.set_company_news("AAPL", [make_news("2024-01-01")])
+    cache.set_company_news("MSFT", [make_news("2024-01-01")])
+
+    assert cache.get_company_news("AAPL") is None
+    assert cache.stats()["company_news"]["evictions"] >= 1
+
+
+def test_export_then_load_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    cache = Cache()
+    cache.set_prices("AAPL", [make_price("2024-01-01"), make_price("2024-01-02")])
+    cache.add_coverage("prices", "AAPL", "2024-01-01", "2024-01-02")
+    cache.set_company_news("AAPL", [make_news("2024-01-01")])
+    cache.export(str(tmp_path))
+
+    loaded = Cache()
+    loaded.load(str(tmp_path))
+    assert loaded.get_prices("AAPL") == cache.get_prices("AAPL")
+    assert loaded.get_company_news("AAPL") == cache.get_company_news("AAPL")
+    assert loaded.get_missing_ranges("prices", "AAPL", "2024-01-01", "2024-01-02") == []
@@ -0,0 +1,65 @@
+import requests
+
+from tools.client import APIClient, RateLimiter, SingleFlight
+
+
+def make_response(status_code: int, text: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = text.encode("utf-8")
+    return response
+
+
+def test_record_then_replay_round_trip(tmp_path, monkeypatch):
+    sent = []
+
+    def send(self, method, url, **kwargs):
+        sent.append((method, url))
+        return make_response(200, '{"prices": []}')
+
+    monkeypatch.setattr(APIClient, "_send", send)
+    client = APIClient()
+    client.set_mode("record", str(tmp_path))
+    recorded = client.post("https://api.financialdatasets.ai/search", json={"tickers": ["AAPL"]})
+
+    client.set_mode("replay", str(tmp_path))
+    replayed = client.post("https://api.financialdatasets.ai/search", json={"tickers": ["AAPL"]})
+
+    assert len(sent) == 1
+    assert (replayed.status_code, replayed.json()) == (recorded.status_code, recorded.json())
+
+
+def test_replay_without_a_recording_fails(tmp_path):
+    client = APIClient()
+    client.set_mode("replay", str(tmp_path))
+    try:
+        client.get("https://api.financialdatasets.ai/prices/?ticker=AAPL")
+    except Exception as e:
+        assert "No recorded response" in str(e)
+    else:
+        raise AssertionError("replay served a response that was never recorded")
+
+
+def test_rate_limiter_allows_a_burst_then_throttles():
+    limiter = RateLimiter(requests_per_minute=6000, burst=2)
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    assert limiter.acquire() > 0
+    assert limiter.stats()["throttled_requests"] == 1
+
+
+def test_single_flight_shares_one_call_per_key():
+    single_flight = SingleFlight()
+    assert single_flight.do("key", lambda: 1) == 1
+    # Once a call has finished, the next one with the same key runs again
+    assert single_flight.do("key", lambda: 2) == 2
+
+
+def test_retry_after_is_honoured_beyond_the_backoff_cap():
+    client = APIClient(backoff_max=30.0, retry_after_max=300.0)
+    response = make_response(429, "")
+    response.headers["Retry-After"] = "120"
+    assert client._retry_after(response) == 120.0
+
+    response.headers["Retry-After"] = "3600"
+    assert client._retry_after(response) == 300.0
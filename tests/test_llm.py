@@ -0,0 +1,80 @@
+import pytest
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel
+
+import llm.models
+from llm.cache import configure_llm_cache, get_llm_cache
+from utils.llm import call_llm, call_llm_batched
+
+
+class Signal(BaseModel):
+    signal: str
+    confidence: float
+
+
+TEMPLATE = ChatPromptTemplate.from_messages([("system", "Rate each ticker."), ("human", "Analysis Data for {ticker}:\n{analysis_data}")])
+
+
+class FakeModel:
+    """Answers batched prompts for all but the tickers in `skip`, and single-ticker prompts with a fixed signal."""
+
+    def __init__(self, skip=()):
+        self.skip = set(skip)
+        self.prompts = []
+
+    def with_structured_output(self, schema, method=None):
+        return FakeStructuredModel(self, schema)
+
+
+class FakeStructuredModel:
+    def __init__(self, model, schema):
+        self.model = model
+        self.schema = schema
+
+    def invoke(self, prompt):
+        messages = prompt.to_messages()
+        self.model.prompts.append(messages)
+        if "at once" in messages[-1].content:
+            tickers = messages[-1].content.split("at once: ")[1].split(". ")[0].split(", ")
+            return self.schema.model_validate({ticker: {"signal": "batched", "confidence": 1} for ticker in tickers if ticker not in self.model.skip})
+        return self.schema(signal="single", confidence=2)
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = FakeModel(skip={"MSFT"})
+    monkeypatch.setattr(llm.models, "get_model", lambda model_name, model_provider: model)
+    llm.models.get_model_registry().clear()
+    configure_llm_cache(enabled=False)
+    yield model
+    llm.models.get_model_registry().clear()
+    configure_llm_cache()
+
+
+def test_batched_prompts_fall_back_per_ticker_for_missing_tickers(fake_model):
+    analysis_data = {ticker: {"score": 1} for ticker in ("AAPL", "MSFT", "NVDA")}
+    results = call_llm_batched(TEMPLATE, analysis_data, model_name="gpt-4o", model_provider="OpenAI", pydantic_model=Signal, batch_size=2)
+
+    assert list(results) == ["AAPL", "MSFT", "NVDA"]
+    assert [result.signal for result in results.values()] == ["batched", "single", "batched"]
+    # Two batches plus one retry for the ticker the first batch left out
+    assert len(fake_model.prompts) == 3
+
+
+def test_batch_size_one_sends_one_prompt_per_ticker(fake_model):
+    analysis_data = {ticker: {"score": 1} for ticker in ("AAPL", "NVDA")}
+    results = call_llm_batched(TEMPLATE, analysis_data, model_name="gpt-4o", model_provider="OpenAI", pydantic_model=Signal, batch_size=1)
+
+    assert [result.signal for result in results.values()] == ["single", "single"]
+    assert all("Analysis Data for AAPL" in messages[-1].content or "Analysis Data for NVDA" in messages[-1].content for messages in fake_model.prompts)
+
+
+def test_response_cache_answers_a_repeated_prompt(fake_model):
+    configure_llm_cache(enabled=True)
+    prompt = TEMPLATE.invoke({"ticker": "AAPL", "analysis_data": "{}"})
+    first = call_llm(prompt, model_name="gpt-4o", model_provider="OpenAI", pydantic_model=Signal)
+    second = call_llm(prompt, model_name="gpt-4o", model_provider="OpenAI", pydantic_model=Signal)
+
+    assert first == second
+    assert len(fake_model.prompts) == 1
+    assert get_llm_cache().stats()["hits"] == 1
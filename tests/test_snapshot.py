@@ -0,0 +1,33 @@
+from data import snapshot as snapshot_module
+from data.snapshot import MarketSnapshot
+from utils.analysts import plan_snapshot_datasets
+
+
+def test_technical_analyst_only_loads_prices():
+    assert plan_snapshot_datasets(["technical_analyst"]) == ["prices"]
+
+
+def test_plan_merges_datasets_of_selected_analysts():
+    assert plan_snapshot_datasets(["warren_buffett", "sentiment_analyst"]) == ["prices", "financial_metrics_ttm", "market_cap", "insider_trades", "company_news"]
+
+
+def test_load_fetches_only_planned_datasets(monkeypatch):
+    calls = []
+    for name in ("get_prices", "get_market_cap", "get_insider_trades", "get_company_news", "get_financial_metrics"):
+        monkeypatch.setattr(snapshot_module.api, name, lambda *args, name=name, **kwargs: calls.append((name, args[0])) or [])
+
+    MarketSnapshot.build(["AAPL", "MSFT"], "2024-01-01", "2024-03-31", datasets=["prices"])
+    assert sorted(calls) == [("get_prices", "AAPL"), ("get_prices", "MSFT")]
+
+
+def test_failed_line_item_search_is_retried_when_an_agent_reads_it(monkeypatch):
+    def fail(*args, **kwargs):
+        raise Exception("Error fetching data: 500")
+
+    searches = []
+    monkeypatch.setattr(snapshot_module.api, "search_line_items_bulk", fail)
+    monkeypatch.setattr(snapshot_module.api, "search_line_items", lambda ticker, *args: searches.append(ticker) or [])
+
+    snapshot = MarketSnapshot.build(["AAPL"], "2024-01-01", "2024-03-31", line_item_searches=[{"line_items": ["revenue"]}], datasets=[])
+    assert snapshot.search_line_items("AAPL", ["revenue"]) == []
+    assert searches == ["AAPL"]